@@ -0,0 +1,217 @@
+from PIL import Image
+
+import numpy as np
+import os
+import struct
+
+from Blocos import processar_em_blocos
+
+#
+    # Arquivos mapeados em memória (memmap)
+#
+
+# Modos de imagem PIL suportados nos TIFFs sem compressão: (tipo, canais)
+_MODOS_TIFF = {
+    'L': (np.uint8, 1),
+    'RGB': (np.uint8, 3),
+    'RGBA': (np.uint8, 4),
+    'I;16': (np.dtype('<u2'), 1),
+    'I;16B': (np.dtype('>u2'), 1),
+}
+
+def abrir_mapeado(caminho, forma=None, tipo=np.uint8, deslocamento=0):
+    """
+    Abre uma imagem em disco como `np.memmap` somente leitura, sem decodificá-la.
+
+    Os pixels só são lidos do disco quando uma região do array é acessada,
+    então a imagem pode ser muito maior que a memória disponível. Use o
+    resultado com `Blocos.processar_em_blocos`, que lê apenas um bloco por vez.
+
+    Formatos suportados:
+    - '.npy': lido com `np.load(..., mmap_mode='r')`.
+    - '.tif'/'.tiff': TIFF sem compressão com os pixels contíguos no arquivo
+      (uma faixa única ou faixas consecutivas), em L, RGB, RGBA ou 16 bits.
+    - Qualquer outra extensão: dados brutos (raw), exigindo `forma`.
+
+    Parâmetros:
+    -----------
+    caminho : str
+        Caminho do arquivo.
+    forma : tuple, opcional
+        (altura, largura[, canais]) dos dados brutos.
+    tipo : dtype, opcional
+        Tipo dos dados brutos. Default = np.uint8
+    deslocamento : int, opcional
+        Bytes a pular no início do arquivo bruto (cabeçalho). Default = 0
+
+    Retorna:
+    --------
+    numpy.memmap
+        Array mapeado em memória no formato (altura, largura[, canais]).
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == '.npy':
+        return np.load(caminho, mmap_mode='r')
+    if extensao in ('.tif', '.tiff'):
+        deslocamento, forma, tipo = _localizar_pixels_tiff(caminho)
+    elif forma is None:
+        raise ValueError("Informe a forma (altura, largura[, canais]) para arquivos brutos.")
+    return np.memmap(caminho, dtype=tipo, mode='r', offset=deslocamento, shape=tuple(forma))
+
+def _localizar_pixels_tiff(caminho):
+    """
+    Encontra o deslocamento, a forma e o tipo dos pixels de um TIFF sem compressão.
+    """
+    with Image.open(caminho) as imagem:
+        if imagem.mode not in _MODOS_TIFF:
+            raise ValueError(f"Modo de TIFF não suportado para mapeamento: {imagem.mode}")
+        tipo, canais = _MODOS_TIFF[imagem.mode]
+        largura, altura = imagem.size
+        bytes_linha = largura * canais * np.dtype(tipo).itemsize
+
+        # Cada faixa precisa ser 'raw' e começar logo após a anterior
+        faixas = sorted(imagem.tile, key=lambda faixa: faixa[1][1])
+        inicio = faixas[0][2]
+        for faixa in faixas:
+            codec, (x0, y0, x1, y1), deslocamento = faixa[0], faixa[1], faixa[2]
+            if codec != 'raw' or x0 != 0 or x1 != largura or deslocamento != inicio + y0 * bytes_linha:
+                raise ValueError("O TIFF precisa estar sem compressão e com os pixels contíguos.")
+
+    forma = (altura, largura) if canais == 1 else (altura, largura, canais)
+    return inicio, forma, tipo
+
+def criar_mapeado(caminho, forma, tipo=np.uint8):
+    """
+    Cria um arquivo de saída e o retorna como `np.memmap` para escrita.
+
+    O arquivo é criado com o tamanho final e os blocos escritos no array vão
+    direto para o disco, sem manter a imagem inteira na memória.
+
+    Formatos suportados:
+    - '.npy': criado com `np.lib.format.open_memmap`.
+    - '.tif'/'.tiff': TIFF clássico sem compressão (8 bits, 1, 3 ou 4 canais,
+      até 4 GB); para arquivos maiores use '.npy' ou dados brutos.
+    - Qualquer outra extensão: dados brutos (raw).
+
+    Parâmetros:
+    -----------
+    caminho : str
+        Caminho do arquivo a criar (sobrescrito se existir).
+    forma : tuple
+        (altura, largura[, canais]).
+    tipo : dtype, opcional
+        Tipo dos pixels. Default = np.uint8
+
+    Retorna:
+    --------
+    numpy.memmap
+        Array mapeado em memória, aberto para leitura e escrita.
+    """
+    forma = tuple(forma)
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == '.npy':
+        return np.lib.format.open_memmap(caminho, mode='w+', dtype=tipo, shape=forma)
+    if extensao in ('.tif', '.tiff'):
+        deslocamento = _escrever_cabecalho_tiff(caminho, forma, tipo)
+        return np.memmap(caminho, dtype=tipo, mode='r+', offset=deslocamento, shape=forma)
+    return np.memmap(caminho, dtype=tipo, mode='w+', shape=forma)
+
+def _escrever_cabecalho_tiff(caminho, forma, tipo):
+    """
+    Escreve o cabeçalho de um TIFF clássico de faixa única e reserva os pixels.
+
+    Retorna:
+    --------
+    int
+        Deslocamento, em bytes, do início dos pixels no arquivo.
+    """
+    if np.dtype(tipo) != np.uint8:
+        raise ValueError("A saída TIFF mapeada suporta apenas pixels de 8 bits.")
+    altura, largura = forma[:2]
+    canais = forma[2] if len(forma) == 3 else 1
+    if canais not in (1, 3, 4):
+        raise ValueError("A saída TIFF mapeada suporta 1, 3 ou 4 canais.")
+    tamanho_pixels = altura * largura * canais
+    if tamanho_pixels >= 2**32 - 4096:
+        raise ValueError("Imagem grande demais para TIFF clássico; use '.npy' ou dados brutos.")
+
+    # Entradas do diretório (tag, tipo, quantidade, valor); tipo 3 = SHORT, 4 = LONG
+    entradas = [
+        (256, 4, 1, largura),
+        (257, 4, 1, altura),
+        (258, 3, canais, 8),
+        (259, 3, 1, 1),                          # sem compressão
+        (262, 3, 1, 1 if canais == 1 else 2),    # escala de cinza ou RGB
+        (273, 4, 1, None),                       # deslocamento dos pixels
+        (277, 3, 1, canais),
+        (278, 4, 1, altura),                     # uma única faixa
+        (279, 4, 1, tamanho_pixels),
+        (284, 3, 1, 1),                          # canais intercalados
+    ]
+    if canais == 4:
+        entradas.append((338, 3, 1, 2))          # alfa não associado
+
+    # Cabeçalho (8) + diretório + BitsPerSample com mais de 2 valores fora do diretório
+    fim_diretorio = 8 + 2 + 12 * len(entradas) + 4
+    deslocamento_bits = fim_diretorio
+    deslocamento_pixels = fim_diretorio + (2 * canais if canais > 2 else 0)
+    deslocamento_pixels += -deslocamento_pixels % 16
+
+    with open(caminho, 'wb') as arquivo:
+        arquivo.write(b'II' + struct.pack('<HI', 42, 8))
+        arquivo.write(struct.pack('<H', len(entradas)))
+        for tag, tipo_tag, quantidade, valor in entradas:
+            if tag == 273:
+                valor = deslocamento_pixels
+            if tag == 258 and canais > 2:
+                campo = struct.pack('<I', deslocamento_bits)
+            elif tipo_tag == 3:
+                campo = struct.pack('<HH', valor, valor if quantidade == 2 else 0)
+            else:
+                campo = struct.pack('<I', valor)
+            arquivo.write(struct.pack('<HHI', tag, tipo_tag, quantidade) + campo)
+        arquivo.write(struct.pack('<I', 0))
+        if canais > 2:
+            arquivo.write(struct.pack('<' + 'H' * canais, *([8] * canais)))
+        arquivo.truncate(deslocamento_pixels + tamanho_pixels)
+
+    return deslocamento_pixels
+
+def filtrar_arquivo(caminho_entrada, caminho_saida, filtro, *args, forma=None, tipo=np.uint8,
+                    tamanho_bloco=1024, memoria_maxima=None, processos=1, **kwargs):
+    """
+    Aplica um filtro de um arquivo mapeado em memória para outro, bloco a bloco.
+
+    A entrada é aberta com `abrir_mapeado` e a saída criada com
+    `criar_mapeado`; o processamento em blocos lê e escreve só um bloco por
+    vez, então a memória residente fica limitada ao orçamento dos blocos,
+    independentemente do tamanho do arquivo.
+
+    Parâmetros:
+    -----------
+    caminho_entrada, caminho_saida : str
+        Arquivos de entrada e saída ('.npy', '.tif'/'.tiff' ou brutos).
+    filtro : função
+        Filtro de `Filtros.py` a aplicar.
+    *args, **kwargs :
+        Parâmetros do filtro (sem a imagem).
+    forma, tipo :
+        Forma e tipo da entrada, se ela for um arquivo bruto.
+    tamanho_bloco, memoria_maxima, processos :
+        Repassados para `Blocos.processar_em_blocos`.
+
+    Retorna:
+    --------
+    numpy.memmap
+        A saída mapeada em memória.
+    """
+    entrada = abrir_mapeado(caminho_entrada, forma, tipo)
+
+    # Descobre o formato da saída filtrando um recorte pequeno da entrada
+    amostra = np.array(filtro(Image.fromarray(np.ascontiguousarray(entrada[:8, :8])), *args, **kwargs))
+    forma_saida = entrada.shape[:2] + amostra.shape[2:]
+
+    saida = criar_mapeado(caminho_saida, forma_saida, amostra.dtype)
+    return processar_em_blocos(entrada, filtro, *args, tamanho_bloco=tamanho_bloco,
+                               memoria_maxima=memoria_maxima, processos=processos,
+                               saida=saida, **kwargs)
@@ -0,0 +1,456 @@
+from PIL import Image
+
+import numpy as np
+import inspect
+import math
+import mmap
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+from Filtros import (limiarizacao, filtro_cinza, passa_alta_basico, passa_alta_alto_reforco,
+                     passa_baixa_media, passa_baixa_mediana, filtro_roberts, filtro_prewitt,
+                     filtro_sobel, transformacao_logaritmica, operacoes_aritmeticas, filtro_ruidos,
+                     _gradiente_sobel, _normalizar)
+
+#
+    # Processamento em blocos (tiles)
+#
+
+# Estimativa de bytes de trabalho por pixel de um bloco (cópias em float32,
+# gradientes e histogramas temporários dos filtros)
+_BYTES_POR_PIXEL = 32
+
+# Raio da vizinhança (halo) que cada filtro precisa, em função dos parâmetros
+_RAIO_FILTROS = {
+    limiarizacao: lambda p: 0,
+    filtro_cinza: lambda p: 0,
+    passa_alta_basico: lambda p: 1,
+    passa_alta_alto_reforco: lambda p: 1,
+    passa_baixa_media: lambda p: p['tamanho_kernel'] // 2,
+    passa_baixa_mediana: lambda p: (p['tamanho_maximo'] if p['modo'] == 'impulsos'
+                                    else p['tamanho_kernel']) // 2,
+    filtro_roberts: lambda p: 1,
+    filtro_prewitt: lambda p: 1,
+    filtro_sobel: lambda p: p['tamanho_kernel'] // 2,
+    transformacao_logaritmica: lambda p: 0,
+    operacoes_aritmeticas: lambda p: 0,
+    filtro_ruidos: lambda p: 0,
+}
+
+def raio_filtro(filtro, *args, **kwargs):
+    """
+    Retorna o raio da vizinhança que um filtro precisa com os parâmetros dados.
+
+    É a largura mínima do halo (linhas e colunas extras ao redor de cada
+    bloco) para que o resultado em blocos seja idêntico ao da imagem inteira.
+
+    Parâmetros:
+    -----------
+    filtro : função
+        Uma das funções de `Filtros.py`.
+    *args, **kwargs :
+        Parâmetros do filtro (sem a imagem).
+
+    Retorna:
+    --------
+    int
+        Raio em pixels (0 para operações pontuais).
+    """
+    if filtro not in _RAIO_FILTROS:
+        raise ValueError(f"O filtro '{filtro.__name__}' não pode ser processado em blocos.")
+
+    parametros = _parametros_filtro(filtro, args, kwargs)
+    if filtro is operacoes_aritmeticas and parametros['operacao'] != 'multiplicacao':
+        raise ValueError("Em blocos, operações aritméticas só suportam a multiplicação por escalar.")
+
+    return _RAIO_FILTROS[filtro](parametros)
+
+def _parametros_filtro(filtro, args, kwargs):
+    """
+    Associa os argumentos aos nomes dos parâmetros do filtro, com os valores padrão.
+    """
+    assinatura = inspect.signature(filtro).bind(None, *args, **kwargs)
+    assinatura.apply_defaults()
+    return assinatura.arguments
+
+def tamanho_bloco_para_memoria(memoria_maxima, raio=0, canais=3):
+    """
+    Calcula o lado do bloco que respeita um orçamento de memória.
+
+    Parâmetros:
+    -----------
+    memoria_maxima : int
+        Orçamento de memória de trabalho por bloco, em bytes.
+    raio : int
+        Raio do halo do filtro.
+    canais : int
+        Número de canais da imagem.
+
+    Retorna:
+    --------
+    int
+        Lado do bloco (sem o halo), no mínimo 16 pixels.
+    """
+    lado_com_halo = int(math.sqrt(memoria_maxima / (canais * _BYTES_POR_PIXEL)))
+    return max(16, lado_com_halo - 2 * raio)
+
+def _dimensoes(origem):
+    """
+    Retorna (altura, largura, canais) de uma imagem PIL ou de um array.
+    """
+    if isinstance(origem, Image.Image):
+        largura, altura = origem.size
+        return altura, largura, len(origem.getbands())
+    canais = origem.shape[2] if origem.ndim == 3 else 1
+    return origem.shape[0], origem.shape[1], canais
+
+def _ler_bloco(origem, y0, y1, x0, x1):
+    """
+    Lê a região [y0:y1, x0:x1] da origem como uma imagem PIL.
+    """
+    if isinstance(origem, Image.Image):
+        return origem.crop((x0, y0, x1, y1))
+    return Image.fromarray(np.ascontiguousarray(origem[y0:y1, x0:x1]))
+
+def gerar_blocos(altura, largura, tamanho_bloco, raio=0):
+    """
+    Divide a imagem em blocos e calcula o halo de cada um.
+
+    Parâmetros:
+    -----------
+    altura, largura : int
+        Dimensões da imagem.
+    tamanho_bloco : int
+        Lado dos blocos (os da última linha/coluna podem ser menores).
+    raio : int
+        Largura do halo, recortada nas bordas da imagem.
+
+    Retorna:
+    --------
+    generator
+        Tuplas ((y0, y1, x0, x1), (hy0, hy1, hx0, hx1)) com a região do bloco
+        e a região lida, incluindo o halo.
+    """
+    for y0 in range(0, altura, tamanho_bloco):
+        y1 = min(y0 + tamanho_bloco, altura)
+        for x0 in range(0, largura, tamanho_bloco):
+            x1 = min(x0 + tamanho_bloco, largura)
+            halo = (max(y0 - raio, 0), min(y1 + raio, altura),
+                    max(x0 - raio, 0), min(x1 + raio, largura))
+            yield (y0, y1, x0, x1), halo
+
+def _recortar(bloco, regiao, halo):
+    """
+    Recorta de um bloco lido com halo apenas a sua região interna.
+    """
+    (y0, y1, x0, x1), (hy0, hy1, hx0, hx1) = regiao, halo
+    return bloco[y0 - hy0:y1 - hy0, x0 - hx0:x1 - hx0]
+
+def _filtrar_bloco(origem, filtro, args, kwargs, regiao, halo):
+    """
+    Lê um bloco com halo, aplica o filtro e devolve a região interna como array.
+    """
+    hy0, hy1, hx0, hx1 = halo
+    bloco = np.array(filtro(_ler_bloco(origem, hy0, hy1, hx0, hx1), *args, **kwargs))
+    return _recortar(bloco, regiao, halo)
+
+def _gradiente_bloco(origem, parametros, regiao, halo):
+    """
+    Calcula o gradiente de Sobel (sem pós-processamento) da região interna de um bloco.
+    """
+    hy0, hy1, hx0, hx1 = halo
+    cinza = np.array(_ler_bloco(origem, hy0, hy1, hx0, hx1).convert("L"), dtype=np.float32)
+    grad = _gradiente_sobel(cinza, parametros['direcao'], parametros['tipo_kernel'],
+                            parametros['tamanho_kernel'])
+    return _recortar(grad, regiao, halo)
+
+def _executar_blocos(acao, origem, saida, filtro, args, kwargs, blocos, extremos=None):
+    """
+    Executa uma ação sobre uma lista de blocos, escrevendo direto na saída.
+
+    Ações:
+    - 'filtro': aplica o filtro e copia a região interna para a saída.
+    - 'extremos': devolve (mínimo, máximo) do gradiente de Sobel nos blocos.
+    - 'normalizar': normaliza o gradiente de Sobel com os `extremos` globais.
+    """
+    if acao == 'filtro':
+        for regiao, halo in blocos:
+            y0, y1, x0, x1 = regiao
+            saida[y0:y1, x0:x1] = _filtrar_bloco(origem, filtro, args, kwargs, regiao, halo)
+        return None
+
+    parametros = _parametros_filtro(filtro, args, kwargs)
+    if acao == 'extremos':
+        min_val = max_val = None
+        for regiao, halo in blocos:
+            grad = _gradiente_bloco(origem, parametros, regiao, halo)
+            min_val = grad.min() if min_val is None else min(min_val, grad.min())
+            max_val = grad.max() if max_val is None else max(max_val, grad.max())
+        return min_val, max_val
+
+    for regiao, halo in blocos:
+        y0, y1, x0, x1 = regiao
+        grad = _gradiente_bloco(origem, parametros, regiao, halo)
+        saida[y0:y1, x0:x1] = _normalizar(grad, *extremos).astype(np.uint8)
+    return None
+
+def processar_em_blocos(imagem, filtro, *args, tamanho_bloco=1024, memoria_maxima=None,
+                        processos=1, blocos_por_tarefa=4, saida=None, **kwargs):
+    """
+    Aplica um filtro de `Filtros.py` bloco a bloco, com halo, e costura o resultado.
+
+    Cada bloco é lido com um halo do tamanho do raio do kernel do filtro, é
+    filtrado isoladamente e só a sua parte interna é copiada para a saída.
+    Como o halo cobre toda a vizinhança usada pelo filtro, o resultado é
+    idêntico ao de aplicar o filtro na imagem inteira, mas a memória de
+    trabalho fica limitada ao tamanho de um bloco.
+
+    O Sobel com pós-processamento 'normalizacao' precisa do mínimo e do
+    máximo globais, então é feito em duas passadas: a primeira só calcula
+    os extremos do gradiente e a segunda normaliza cada bloco com eles.
+
+    Com `processos` > 1, os blocos são distribuídos entre processos. A
+    entrada e a saída ficam em `multiprocessing.shared_memory`: cada processo
+    lê seus blocos e escreve o resultado direto na saída compartilhada, sem
+    devolver os pixels por pickle. O resultado é idêntico ao sequencial.
+    Entradas e saídas em `np.memmap` não são copiadas: cada processo abre o
+    mesmo arquivo mapeado e lê ou escreve apenas os seus blocos.
+
+    Parâmetros:
+    -----------
+    imagem : PIL.Image ou numpy.ndarray
+        Imagem de entrada. Um array (por exemplo, um `np.memmap`) é lido
+        apenas nas regiões de cada bloco.
+    filtro : função
+        Filtro de `Filtros.py` a aplicar (ver `raio_filtro`).
+    *args, **kwargs :
+        Parâmetros do filtro (sem a imagem).
+    tamanho_bloco : int, opcional
+        Lado dos blocos, em pixels. Default = 1024
+    memoria_maxima : int, opcional
+        Orçamento de memória por bloco, em bytes. Se informado, define o
+        tamanho do bloco no lugar de `tamanho_bloco`.
+    processos : int, opcional
+        Número de processos. Default = 1 (sequencial).
+    blocos_por_tarefa : int, opcional
+        Quantos blocos cada tarefa enviada a um processo contém. Default = 4
+    saida : numpy.ndarray, opcional
+        Array pré-alocado (por exemplo, um `np.memmap` criado com
+        `Arquivos.criar_mapeado`) onde o resultado é escrito bloco a bloco.
+
+    Retorna:
+    --------
+    PIL.Image ou numpy.ndarray
+        Imagem filtrada, do mesmo tipo da entrada, ou o próprio array `saida`.
+    """
+    raio = raio_filtro(filtro, *args, **kwargs)
+    altura, largura, canais = _dimensoes(imagem)
+    if memoria_maxima is not None:
+        tamanho_bloco = tamanho_bloco_para_memoria(memoria_maxima, raio, canais)
+
+    if processos > 1 and isinstance(imagem, Image.Image) and imagem.mode == 'P':
+        # Em paralelo a imagem é copiada como array; a paleta é expandida antes
+        imagem = imagem.convert('RGBA' if 'transparency' in imagem.info else 'RGB')
+
+    parametros = _parametros_filtro(filtro, args, kwargs)
+    normalizar_sobel = filtro is filtro_sobel and parametros['pos_processamento'] == 'normalizacao'
+    blocos = list(gerar_blocos(altura, largura, tamanho_bloco, raio))
+
+    if normalizar_sobel:
+        formato = ((altura, largura), np.uint8)
+    else:
+        # O primeiro bloco é filtrado aqui e define o formato da saída
+        primeiro = _filtrar_bloco(imagem, filtro, args, kwargs, *blocos[0])
+        formato = ((altura, largura) + primeiro.shape[2:], primeiro.dtype)
+
+    destino = saida
+    if destino is not None and destino.shape != formato[0]:
+        raise ValueError(f"A saída deve ter formato {formato[0]}, mas tem {destino.shape}.")
+
+    if processos > 1:
+        saida = _processar_em_processos(imagem, formato, filtro, args, kwargs, blocos,
+                                        normalizar_sobel, processos, blocos_por_tarefa,
+                                        None if normalizar_sobel else primeiro, destino)
+    else:
+        saida = np.empty(formato[0], dtype=formato[1]) if destino is None else destino
+        if normalizar_sobel:
+            extremos = _executar_blocos('extremos', imagem, saida, filtro, args, kwargs, blocos)
+            _executar_blocos('normalizar', imagem, saida, filtro, args, kwargs, blocos, extremos)
+        else:
+            y0, y1, x0, x1 = blocos[0][0]
+            saida[y0:y1, x0:x1] = primeiro
+            _executar_blocos('filtro', imagem, saida, filtro, args, kwargs, blocos[1:])
+
+    if destino is not None:
+        if isinstance(destino, np.memmap):
+            destino.flush()
+        return destino
+    if isinstance(imagem, Image.Image):
+        return Image.fromarray(saida)
+    return saida
+
+#
+    # Execução em múltiplos processos
+#
+
+# Arrays compartilhados do processo trabalhador, abertos uma vez por processo
+_COMPARTILHADO = {}
+
+def _iniciar_trabalhador(descritor_entrada, descritor_saida):
+    """
+    Abre, em cada processo do pool, a entrada e a saída compartilhadas.
+
+    Cada descritor é ('memoria', nome, forma, tipo) para um bloco de
+    `shared_memory` ou ('arquivo', caminho, deslocamento, forma, tipo, modo)
+    para um arquivo mapeado em memória.
+    """
+    for chave, descritor in (('entrada', descritor_entrada), ('saida', descritor_saida)):
+        if descritor[0] == 'arquivo':
+            _, caminho, deslocamento, forma, tipo, modo = descritor
+            _COMPARTILHADO[chave] = np.memmap(caminho, dtype=tipo, mode=modo,
+                                              offset=deslocamento, shape=forma)
+        else:
+            _, nome, forma, tipo = descritor
+            memoria = shared_memory.SharedMemory(name=nome)
+            _COMPARTILHADO['memoria_' + chave] = memoria
+            _COMPARTILHADO[chave] = np.ndarray(forma, dtype=tipo, buffer=memoria.buf)
+
+def _descritor_arquivo(array, modo):
+    """
+    Retorna o descritor de um `np.memmap` que mapeia um arquivo inteiro, ou None.
+
+    Só memmaps criados diretamente sobre o arquivo (e não fatias deles) podem
+    ser reabertos pelos processos a partir do caminho e do deslocamento.
+    """
+    if (isinstance(array, np.memmap) and array.filename is not None
+            and isinstance(array.base, mmap.mmap) and array.flags.c_contiguous):
+        return ('arquivo', array.filename, array.offset, array.shape, array.dtype, modo)
+    return None
+
+def _executar_tarefa(tarefa):
+    """
+    Executa uma tarefa (ação sobre uma lista de blocos) num processo do pool.
+    """
+    acao, filtro, args, kwargs, blocos, extremos = tarefa
+    return _executar_blocos(acao, _COMPARTILHADO['entrada'], _COMPARTILHADO['saida'],
+                            filtro, args, kwargs, blocos, extremos)
+
+def _array_compartilhado(forma, tipo):
+    """
+    Cria um array NumPy sobre um novo bloco de memória compartilhada.
+    """
+    tamanho = max(1, int(np.prod(forma)) * np.dtype(tipo).itemsize)
+    memoria = shared_memory.SharedMemory(create=True, size=tamanho)
+    return memoria, np.ndarray(forma, dtype=tipo, buffer=memoria.buf)
+
+def _processar_em_processos(imagem, formato, filtro, args, kwargs, blocos, normalizar_sobel,
+                            processos, blocos_por_tarefa, primeiro=None, destino=None):
+    """
+    Distribui os blocos entre processos, com entrada e saída compartilhadas.
+
+    Arrays mapeados em arquivo são reabertos pelos processos; os demais são
+    copiados para `shared_memory`.
+    """
+    memorias = []
+    try:
+        descritor_entrada = _descritor_arquivo(imagem, 'r')
+        if descritor_entrada is None:
+            origem = np.asarray(imagem)
+            memoria_entrada, entrada = _array_compartilhado(origem.shape, origem.dtype)
+            memorias.append(memoria_entrada)
+            entrada[...] = origem
+            descritor_entrada = ('memoria', memoria_entrada.name, entrada.shape, entrada.dtype)
+
+        descritor_saida = _descritor_arquivo(destino, 'r+')
+        if descritor_saida is None:
+            memoria_saida, saida = _array_compartilhado(*formato)
+            memorias.append(memoria_saida)
+            descritor_saida = ('memoria', memoria_saida.name, saida.shape, saida.dtype)
+        else:
+            saida = destino
+
+        if primeiro is not None:
+            y0, y1, x0, x1 = blocos[0][0]
+            saida[y0:y1, x0:x1] = primeiro
+            blocos = blocos[1:]
+        if isinstance(saida, np.memmap):
+            # Garante que o primeiro bloco chegue ao arquivo antes dos processos
+            saida.flush()
+        grupos = [blocos[i:i + blocos_por_tarefa] for i in range(0, len(blocos), blocos_por_tarefa)]
+
+        def tarefas(acao, extremos=None):
+            return [(acao, filtro, args, kwargs, grupo, extremos) for grupo in grupos]
+
+        with multiprocessing.Pool(processos, _iniciar_trabalhador,
+                                  (descritor_entrada, descritor_saida)) as pool:
+            if normalizar_sobel:
+                parciais = pool.map(_executar_tarefa, tarefas('extremos'))
+                extremos = (min(p[0] for p in parciais), max(p[1] for p in parciais))
+                pool.map(_executar_tarefa, tarefas('normalizar', extremos))
+            else:
+                pool.map(_executar_tarefa, tarefas('filtro'))
+
+        if saida is destino:
+            return destino
+        if destino is not None:
+            destino[...] = saida
+            return destino
+
+        # Copia o resultado antes de liberar a memória compartilhada
+        return saida.copy()
+    finally:
+        for memoria in memorias:
+            memoria.close()
+            memoria.unlink()
+
+#
+    # Medição de desempenho
+#
+
+def medir_aceleracao(imagem, filtro, *args, threads=(1, 2, 4, 8), repeticoes=3, **kwargs):
+    """
+    Mede o tempo de um filtro com diferentes números de threads (curva de aceleração).
+
+    O filtro precisa aceitar o parâmetro `threads` (por exemplo `filtro_sobel`,
+    `passa_alta_basico`, `passa_baixa_media`, `passa_baixa_mediana` ou
+    `equalizar_histograma`). Para cada quantidade de threads é usado o
+    melhor tempo entre as repetições, e a aceleração é relativa à primeira
+    quantidade da lista.
+
+    Parâmetros:
+    -----------
+    imagem : PIL.Image
+        Imagem de entrada.
+    filtro : função
+        Filtro a medir.
+    *args, **kwargs :
+        Parâmetros do filtro (sem a imagem e sem `threads`).
+    threads : sequência de int, opcional
+        Quantidades de threads a testar. Default = (1, 2, 4, 8)
+    repeticoes : int, opcional
+        Execuções por quantidade de threads. Default = 3
+
+    Retorna:
+    --------
+    list
+        Tuplas (threads, tempo em segundos, aceleração).
+    """
+    resultados = []
+    for quantidade in threads:
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            filtro(imagem, *args, threads=quantidade, **kwargs)
+            tempos.append(time.perf_counter() - inicio)
+        resultados.append((quantidade, min(tempos)))
+
+    tempo_base = resultados[0][1]
+    curva = [(quantidade, tempo, tempo_base / tempo) for quantidade, tempo in resultados]
+
+    print(f"{filtro.__name__}: {imagem.size[0]}x{imagem.size[1]}")
+    print(f"{'threads':>8} {'tempo (s)':>10} {'aceleração':>11}")
+    for quantidade, tempo, aceleracao in curva:
+        print(f"{quantidade:>8} {tempo:>10.4f} {aceleracao:>10.2f}x")
+
+    return curva
@@ -0,0 +1,133 @@
+from PIL import Image
+
+from Filtros import *
+from Histograma import equalizar_histograma, equalizar_histograma_adaptativa
+from Histograma import especificar_histograma, perfil_referencia
+
+#
+    # Catálogo de filtros (usado pela interface e pelo processamento em lote)
+#
+
+# Lista de filtros disponíveis
+filtros_disponiveis = [
+    "Limiriazação",
+    "Escala de Cinza", 
+    "Passa-Alta Básico",
+    "Passa-Alta Alto Reforço",
+    "Passa-Baixa Média",
+    "Passa-Baixa Mediana",
+    "Roberts",
+    "Prewitt",
+    "Sobel",
+    "Transformação Logarítmica",
+    "Operações Aritméticas",
+    "Ruídos",
+    "Histograma",
+    "Equalização de Histograma",
+    "Equalização Adaptativa (CLAHE)",
+    "Especificação de Histograma"
+]
+
+# Define quais parâmetros cada filtro precisa
+filtros_parametros = {
+    "Limiriazação": ["limiar"],
+    "Passa-Alta Básico": ["kernel_pa_basico"],
+    "Passa-Alta Alto Reforço": ["kernel_pa_basico", "fator_k", "reforco_recortado"],
+    "Passa-Baixa Média": ["kernel"],
+    "Passa-Baixa Mediana": ["kernel", "mediana_impulsos"],
+    "Sobel": ["direcao", "pos_processamento"],
+    "Transformação Logarítmica": [],
+    "Ruídos": ["taxa_ruido"],
+    "Operações Aritméticas": ["operacao", "segunda_imagem", "escalar"],
+    "Equalização de Histograma": ["equalizacao_luminancia"],
+    "Equalização Adaptativa (CLAHE)": ["limite_corte"],
+    "Especificação de Histograma": ["segunda_imagem", "equalizacao_luminancia"]
+}
+
+# Valores padrão dos parâmetros (os mesmos da interface)
+parametros_padrao = {
+    "limiar": 150,
+    "kernel": 3,
+    "mediana_impulsos": False,
+    "kernel_pa_basico": 'laplaciano_4',
+    "fator_k": 1.0,
+    "reforco_recortado": False,
+    "direcao": 'ambos',
+    "pos_processamento": 'clipping',
+    "taxa_ruido": 0.05,
+    "operacao": 'soma',
+    "segunda_imagem": None,
+    "escalar": 1.0,
+    "equalizacao_global": False,
+    "equalizacao_luminancia": False,
+    "limite_corte": 2.0,
+}
+
+def _operacao_aritmetica(imagem, p):
+    # Mesma operação da interface (colorida, com a segunda imagem ponderada pelo escalar)
+    segunda = p["segunda_imagem"]
+    if isinstance(segunda, str):
+        segunda = Image.open(segunda)
+    return operacao_com_segunda_imagem(imagem, segunda, p["operacao"], escalar=p["escalar"])
+
+def _especificacao(imagem, p):
+    # "perfil" é o perfil de referência já calculado (ver Lote.processar_lote)
+    perfil = p.get("perfil")
+    if perfil is None:
+        referencia = p["segunda_imagem"]
+        if referencia is None:
+            raise ValueError("A especificação de histograma precisa de uma imagem de referência.")
+        if isinstance(referencia, str):
+            referencia = Image.open(referencia)
+        perfil = perfil_referencia(referencia)
+    return especificar_histograma(imagem, perfil, modo='luminancia' if p["equalizacao_luminancia"] else 'cinza')
+
+# Como cada filtro do catálogo é chamado a partir dos parâmetros
+_APLICAR = {
+    "Limiriazação": lambda img, p: limiarizacao(img, p["limiar"]),
+    "Escala de Cinza": lambda img, p: filtro_cinza(img),
+    "Passa-Alta Básico": lambda img, p: passa_alta_basico(img, tipo_kernel=p["kernel_pa_basico"]),
+    "Passa-Alta Alto Reforço": lambda img, p: passa_alta_alto_reforco(
+        img, fator_k=p["fator_k"], tipo_kernel_base=p["kernel_pa_basico"],
+        recortar_bordas=p["reforco_recortado"]),
+    "Passa-Baixa Média": lambda img, p: passa_baixa_media(img, p["kernel"]),
+    "Passa-Baixa Mediana": lambda img, p: passa_baixa_mediana(
+        img, p["kernel"], modo='impulsos' if p["mediana_impulsos"] else 'completo'),
+    "Roberts": lambda img, p: filtro_roberts(img),
+    "Prewitt": lambda img, p: filtro_prewitt(img),
+    "Sobel": lambda img, p: filtro_sobel(img, direcao=p["direcao"], pos_processamento=p["pos_processamento"]),
+    "Transformação Logarítmica": lambda img, p: transformacao_logaritmica(img),
+    "Operações Aritméticas": _operacao_aritmetica,
+    "Ruídos": lambda img, p: filtro_ruidos(img, taxa_ruido=p["taxa_ruido"]),
+    # "histograma" é o histograma acumulado do lote (ver Lote.processar_lote)
+    "Equalização de Histograma": lambda img, p: equalizar_histograma(
+        img, histograma=p.get("histograma"), modo='luminancia' if p["equalizacao_luminancia"] else 'cinza'),
+    "Equalização Adaptativa (CLAHE)": lambda img, p: equalizar_histograma_adaptativa(
+        img, limite_corte=p["limite_corte"]),
+    "Especificação de Histograma": _especificacao,
+}
+
+def aplicar_filtro(nome, imagem, parametros=None):
+    """
+    Aplica um filtro do catálogo pelo nome exibido na interface.
+
+    Parâmetros:
+    -----------
+    nome : str
+        Nome do filtro, como em `filtros_disponiveis`.
+    imagem : PIL.Image
+        Imagem de entrada.
+    parametros : dict, opcional
+        Valores dos parâmetros listados em `filtros_parametros`; os ausentes
+        usam `parametros_padrao`.
+
+    Retorna:
+    --------
+    PIL.Image
+        Imagem filtrada.
+    """
+    if nome not in _APLICAR:
+        raise ValueError(f"Filtro '{nome}' não pode ser aplicado sem a interface.")
+    p = dict(parametros_padrao)
+    p.update(parametros or {})
+    return _APLICAR[nome](imagem, p)
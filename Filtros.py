@@ -1,10 +1,788 @@
 from PIL import Image  
 
 import numpy as np
-import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+#
+    # Convolução
+#
+
+def _convolucao(img_array, kernel):
+    """
+    Aplica um kernel quadrado de tamanho ímpar sobre um array 2D inteiro de uma vez.
+
+    Em vez de percorrer pixel a pixel, soma fatias deslocadas da imagem
+    multiplicadas pelo peso correspondente do kernel. O kernel é aplicado
+    sem espelhamento, exatamente como a soma `np.sum(vizinhanca * kernel)`
+    feita nos laços originais. As bordas de raio `k // 2`, onde a vizinhança
+    não cabe inteira na imagem, permanecem zeradas.
+
+    Parâmetros:
+    -----------
+    img_array : numpy.ndarray
+        Array 2D (escala de cinza) em ponto flutuante.
+    kernel : numpy.ndarray
+        Kernel quadrado de tamanho ímpar (3x3, 5x5, ...).
+
+    Retorna:
+    --------
+    numpy.ndarray
+        Array float32 com as mesmas dimensões da entrada.
+    """
+    kernel = np.asarray(kernel, dtype=np.float32)
+
+    # Kernels de posto 1 (Sobel, Prewitt, ...) usam dois passes 1-D
+    fatores = _decompor_separavel(kernel)
+    if fatores is not None:
+        return _convolucao_separavel(img_array, *fatores)
+
+    tamanho = kernel.shape[0]
+    raio = tamanho // 2
+    altura, largura = img_array.shape
+    img_saida_array = np.zeros((altura, largura), dtype=np.float32)
+
+    if altura <= 2 * raio or largura <= 2 * raio:
+        return img_saida_array
+
+    # Região interna onde a vizinhança completa está disponível
+    interior = img_saida_array[raio:altura - raio, raio:largura - raio]
+    for i in range(tamanho):
+        for j in range(tamanho):
+            peso = kernel[i, j]
+            if peso == 0:
+                continue
+            interior += peso * img_array[i:altura - tamanho + 1 + i, j:largura - tamanho + 1 + j]
+
+    return img_saida_array
+
+def _decompor_separavel(kernel):
+    """
+    Verifica se um kernel 2D é separável (posto 1) e o decompõe em dois vetores.
+
+    Um kernel separável pode ser escrito como o produto externo de um vetor
+    coluna (passe vertical) por um vetor linha (passe horizontal). Os fatores
+    são extraídos da linha e da coluna que contêm o maior peso absoluto, o que
+    mantém os valores inteiros em kernels como Sobel e Prewitt.
+
+    Parâmetros:
+    -----------
+    kernel : numpy.ndarray
+        Kernel quadrado de tamanho ímpar.
+
+    Retorna:
+    --------
+    tuple ou None
+        (coluna, linha) se o kernel for separável, ou None caso contrário.
+    """
+    kernel = np.asarray(kernel, dtype=np.float32)
+    linha_ref, coluna_ref = np.unravel_index(np.argmax(np.abs(kernel)), kernel.shape)
+    pivo = kernel[linha_ref, coluna_ref]
+    if pivo == 0:
+        return None
+
+    coluna = kernel[:, coluna_ref]
+    linha = kernel[linha_ref, :] / pivo
+    if not np.allclose(np.outer(coluna, linha), kernel):
+        return None
+
+    return coluna, linha
+
+def _convolucao_separavel(img_array, coluna, linha):
+    """
+    Aplica um kernel separável em dois passes 1-D (vertical e depois horizontal).
+
+    O resultado é o mesmo de aplicar o kernel 2D `np.outer(coluna, linha)`,
+    mas o custo por pixel cai de O(k²) para O(k). As bordas de raio `k // 2`
+    permanecem zeradas, como em `_convolucao`.
+
+    Parâmetros:
+    -----------
+    img_array : numpy.ndarray
+        Array 2D (escala de cinza) em ponto flutuante.
+    coluna : array-like
+        Pesos do passe vertical (tamanho ímpar).
+    linha : array-like
+        Pesos do passe horizontal (mesmo tamanho de `coluna`).
+
+    Retorna:
+    --------
+    numpy.ndarray
+        Array float32 com as mesmas dimensões da entrada.
+    """
+    coluna = np.asarray(coluna, dtype=np.float32)
+    linha = np.asarray(linha, dtype=np.float32)
+    tamanho = coluna.shape[0]
+    raio = tamanho // 2
+    altura, largura = img_array.shape
+    img_saida_array = np.zeros((altura, largura), dtype=np.float32)
+
+    if altura <= 2 * raio or largura <= 2 * raio:
+        return img_saida_array
+
+    # Passe vertical: combina linhas deslocadas
+    parcial = np.zeros((altura - 2 * raio, largura), dtype=np.float32)
+    for i in range(tamanho):
+        if coluna[i] != 0:
+            parcial += coluna[i] * img_array[i:altura - tamanho + 1 + i, :]
+
+    # Passe horizontal: combina colunas deslocadas do resultado parcial
+    interior = img_saida_array[raio:altura - raio, raio:largura - raio]
+    for j in range(tamanho):
+        if linha[j] != 0:
+            interior += linha[j] * parcial[:, j:largura - tamanho + 1 + j]
+
+    return img_saida_array
+
+def _tabela_integral(img_array):
+    """
+    Calcula a imagem integral (tabela de somas acumuladas) de um array.
+
+    A tabela tem uma linha e uma coluna de zeros à frente, de modo que
+    `T[y, x]` é a soma de todos os pixels acima e à esquerda de (y, x).
+    Para imagens coloridas, cada canal é acumulado separadamente.
+
+    Parâmetros:
+    -----------
+    img_array : numpy.ndarray
+        Array 2D (escala de cinza) ou 3D (altura, largura, canais).
+
+    Retorna:
+    --------
+    numpy.ndarray
+        Tabela de formato (altura + 1, largura + 1[, canais]) em inteiros
+        (ou float64, se a entrada for de ponto flutuante).
+    """
+    altura, largura = img_array.shape[:2]
+    if np.issubdtype(img_array.dtype, np.floating):
+        tipo = np.float64
+    else:
+        # Para imagens de 8 bits, int32 basta enquanto a soma total couber nele
+        cabe_int32 = img_array.dtype.itemsize == 1 and 255 * altura * largura < 2**31
+        tipo = np.int32 if cabe_int32 else np.int64
+
+    integral = np.zeros((altura + 1, largura + 1) + img_array.shape[2:], dtype=tipo)
+    np.cumsum(img_array, axis=0, dtype=tipo, out=integral[1:, 1:])
+    np.cumsum(integral[1:, 1:], axis=1, out=integral[1:, 1:])
+    return integral
+
+def _media_caixa(img_array, tamanho_kernel):
+    """
+    Calcula a média de cada janela k x k usando a imagem integral.
+
+    Cada soma de janela sai de quatro consultas à tabela, independentemente
+    do tamanho do kernel. Nas bordas a janela é recortada aos limites da
+    imagem e a média é feita só sobre os vizinhos válidos.
+
+    Parâmetros:
+    -----------
+    img_array : numpy.ndarray
+        Array 2D ou 3D (altura, largura, canais).
+    tamanho_kernel : int
+        Tamanho (ímpar) da janela.
+
+    Retorna:
+    --------
+    numpy.ndarray
+        Array float32 com as médias, mesmo formato da entrada.
+    """
+    altura, largura = img_array.shape[:2]
+    limite = tamanho_kernel // 2
+    integral = _tabela_integral(img_array)
+
+    # Limites (recortados) da janela de cada linha e de cada coluna
+    linhas = np.arange(altura)
+    colunas = np.arange(largura)
+    y0 = np.clip(linhas - limite, 0, altura)
+    y1 = np.clip(linhas + limite + 1, 0, altura)
+    x0 = np.clip(colunas - limite, 0, largura)
+    x1 = np.clip(colunas + limite + 1, 0, largura)
+
+    soma = (integral[np.ix_(y1, x1)] - integral[np.ix_(y0, x1)]
+            - integral[np.ix_(y1, x0)] + integral[np.ix_(y0, x0)])
+    contador = np.outer(y1 - y0, x1 - x0)
+    if img_array.ndim == 3:
+        contador = contador[:, :, np.newaxis]
+
+    return soma.astype(np.float32) / contador.astype(np.float32)
+
+def _mediana_histograma(img_array, tamanho_kernel):
+    """
+    Calcula a mediana de cada janela k x k com histogramas deslizantes.
+
+    Segue o método de Perreault-Hébert: cada coluna da imagem mantém o
+    histograma dos seus k pixels na janela vertical atual. Ao descer uma
+    linha, cada histograma de coluna recebe um pixel e perde outro (custo
+    constante). O histograma da janela k x k de cada pixel é a diferença de
+    duas somas acumuladas ao longo da linha, e a mediana é o primeiro nível
+    em que a contagem acumulada passa de n // 2.
+
+    A busca é feita em dois níveis: primeiro em 16 faixas grossas de
+    intensidade e depois só nos 16 níveis da faixa encontrada. Todas as
+    colunas e canais de uma linha são processados de uma vez, com custo
+    fixo por pixel (independente do kernel); para kernels pequenos,
+    `_mediana_ordenacao` é mais rápida (ver `_KERNEL_MAXIMO_ORDENACAO`).
+
+    Só para imagens de 8 bits: os histogramas por coluna ocupam memória
+    proporcional ao número de níveis (outros tipos usam `_mediana_ordenacao`).
+
+    Parâmetros:
+    -----------
+    img_array : numpy.ndarray
+        Array 2D ou 3D (altura, largura, canais) uint8.
+    tamanho_kernel : int
+        Tamanho (ímpar) da janela.
+
+    Retorna:
+    --------
+    numpy.ndarray
+        Array com as medianas, mesmo formato da entrada.
+    """
+    if img_array.dtype != np.uint8:
+        raise ValueError("A mediana por histogramas requer uma imagem de 8 bits (uint8)")
+
+    plano = img_array if img_array.ndim == 3 else img_array[:, :, np.newaxis]
+    altura, largura, canais = plano.shape
+    limite = tamanho_kernel // 2
+    saida = np.zeros((altura, largura, canais), dtype=np.int64)
+
+    # Níveis de intensidade agrupados em faixas grossas de 16 níveis finos
+    fino = 16
+    maximo = int(plano.max()) if plano.size else 0
+    faixas = maximo // fino + 1
+
+    # Índices para endereçar (coluna, canal) de uma linha inteira de uma vez
+    idx_coluna = np.arange(largura)[:, np.newaxis]
+    idx_canal = np.arange(canais)[np.newaxis, :]
+
+    # Limites (recortados) da janela horizontal de cada coluna
+    colunas = np.arange(largura)
+    x0 = np.clip(colunas - limite, 0, largura)
+    x1 = np.clip(colunas + limite + 1, 0, largura)
+    largura_janela = x1 - x0
+
+    # Histogramas de coluna finos (largura, canais, faixas, 16) e grossos
+    hist_fino = np.zeros((largura, canais, faixas, fino), dtype=np.int32)
+    hist_grosso = np.zeros((largura, canais, faixas), dtype=np.int32)
+    acum_fino = np.zeros((largura + 1, canais, faixas, fino), dtype=np.int32)
+    acum_grosso = np.zeros((largura + 1, canais, faixas), dtype=np.int32)
+
+    def atualizar(linha, delta):
+        valores = plano[linha].astype(np.intp)
+        faixa = valores // fino
+        hist_fino[idx_coluna, idx_canal, faixa, valores % fino] += delta
+        hist_grosso[idx_coluna, idx_canal, faixa] += delta
+
+    for linha in range(min(limite, altura)):
+        atualizar(linha, 1)
+
+    for y in range(altura):
+        # Desliza a janela vertical: entra a linha y + limite, sai y - limite - 1
+        if y + limite < altura:
+            atualizar(y + limite, 1)
+        if y - limite - 1 >= 0:
+            atualizar(y - limite - 1, -1)
+
+        altura_janela = min(y + limite + 1, altura) - max(y - limite, 0)
+        metade = ((altura_janela * largura_janela) // 2)[:, np.newaxis]
+
+        # Nível grosso: histograma da janela k x k por diferença de somas acumuladas
+        np.cumsum(hist_grosso, axis=0, out=acum_grosso[1:])
+        janela_grossa = np.cumsum(acum_grosso[x1] - acum_grosso[x0], axis=2)
+        faixa = np.count_nonzero(janela_grossa <= metade[:, :, np.newaxis], axis=2)
+        anterior = np.take_along_axis(janela_grossa, np.maximum(faixa - 1, 0)[:, :, np.newaxis], axis=2)[:, :, 0]
+        anterior = np.where(faixa > 0, anterior, 0)
+
+        # Nível fino: só os 16 níveis da faixa escolhida para cada (coluna, canal),
+        # também por diferença de somas acumuladas (custo fixo de 256 níveis por pixel)
+        np.cumsum(hist_fino, axis=0, out=acum_fino[1:])
+        janela_fina = (acum_fino[x1[:, np.newaxis], idx_canal, faixa]
+                       - acum_fino[x0[:, np.newaxis], idx_canal, faixa])
+        janela_fina = anterior[:, :, np.newaxis] + np.cumsum(janela_fina, axis=2)
+        saida[y] = faixa * fino + np.count_nonzero(janela_fina <= metade[:, :, np.newaxis], axis=2)
+
+    return saida if img_array.ndim == 3 else saida[:, :, 0]
+
+# Memória máxima das janelas ordenadas de uma faixa em `_mediana_ordenacao`
+_BYTES_FAIXA_ORDENACAO = 32 * 2**20
+
+# Maior kernel em que ordenar as janelas de 8 bits é mais rápido que os
+# histogramas deslizantes (medido em 1 MP: ordenação 0,2 s em k=3 e 1,7 s em
+# k=15; histogramas cerca de 4 s em qualquer k)
+_KERNEL_MAXIMO_ORDENACAO = 15
+
+def _mediana_ordenacao(img_array, tamanho_kernel):
+    """
+    Calcula a mediana de cada janela k x k ordenando os valores da janela.
+
+    Usada para kernels pequenos em imagens de 8 bits e para imagens de
+    16 bits, 32 bits ou ponto flutuante, em que os histogramas deslizantes
+    ficariam grandes demais.
+    A imagem é processada em faixas de linhas, com as janelas de uma faixa
+    ordenadas de uma vez e a memória limitada a `_BYTES_FAIXA_ORDENACAO`.
+    Como na varredura original, nas bordas só os vizinhos dentro da imagem
+    contam e a mediana é o elemento de índice n // 2 da lista ordenada.
+
+    Parâmetros:
+    -----------
+    img_array : numpy.ndarray
+        Array 2D ou 3D (altura, largura, canais) de qualquer tipo numérico.
+    tamanho_kernel : int
+        Tamanho (ímpar) da janela.
+
+    Retorna:
+    --------
+    numpy.ndarray
+        Array float64 com as medianas, mesmo formato da entrada.
+    """
+    plano = img_array if img_array.ndim == 3 else img_array[:, :, np.newaxis]
+    altura, largura, canais = plano.shape
+    limite = tamanho_kernel // 2
+
+    # float64 representa exatamente inteiros de até 32 bits e float32; os
+    # vizinhos fora da imagem valem +inf e ficam no fim da ordenação
+    preenchido = np.pad(plano.astype(np.float64), ((limite, limite), (limite, limite), (0, 0)),
+                        constant_values=np.inf)
+    saida = np.empty((altura, largura, canais), dtype=np.float64)
+
+    # Quantidade de vizinhos dentro da imagem em cada linha e coluna
+    linhas, colunas = np.arange(altura), np.arange(largura)
+    altura_janela = np.minimum(linhas + limite + 1, altura) - np.maximum(linhas - limite, 0)
+    largura_janela = np.minimum(colunas + limite + 1, largura) - np.maximum(colunas - limite, 0)
+
+    bytes_linha = largura * canais * tamanho_kernel * tamanho_kernel * 8
+    linhas_por_faixa = max(1, _BYTES_FAIXA_ORDENACAO // max(bytes_linha, 1))
+    for y0 in range(0, altura, linhas_por_faixa):
+        y1 = min(y0 + linhas_por_faixa, altura)
+        janelas = np.lib.stride_tricks.sliding_window_view(
+            preenchido[y0:y1 + 2 * limite], (tamanho_kernel, tamanho_kernel), axis=(0, 1))
+        janelas = np.sort(janelas.reshape(y1 - y0, largura, canais, -1), axis=3)
+
+        quantidade = altura_janela[y0:y1, np.newaxis] * largura_janela[np.newaxis, :]
+        indice = np.broadcast_to((quantidade // 2)[:, :, np.newaxis, np.newaxis], (y1 - y0, largura, canais, 1))
+        saida[y0:y1] = np.take_along_axis(janelas, indice, axis=3)[:, :, :, 0]
+
+    return saida if img_array.ndim == 3 else saida[:, :, 0]
+
+# Memória máxima de cada array (candidatos x janela) em `_mediana_impulsos`
+_BYTES_BLOCO_IMPULSOS = 8 * 2**20
+
+def _mediana_impulsos(img_array, tamanho_kernel, tamanho_maximo):
+    """
+    Remove ruído sal e pimenta recalculando só os pixels com valor 0 ou 255.
+    Só para imagens de 8 bits (uint8).
+
+    Monta uma máscara dos candidatos a ruído e, para cada um, calcula a
+    mediana apenas dos vizinhos válidos (dentro da imagem e fora da máscara).
+    Quando toda a vizinhança é ruído, a janela cresce de 2 em 2 até
+    `tamanho_maximo`; se ainda assim não houver vizinho válido (por exemplo,
+    numa região realmente saturada), o pixel é mantido. Cada canal é tratado
+    de forma independente e os pixels fora da máscara não são alterados.
+
+    Os candidatos são resolvidos em blocos, de modo que cada array de
+    vizinhanças ocupe no máximo `_BYTES_BLOCO_IMPULSOS`, independentemente
+    da taxa de ruído e do tamanho da imagem.
+
+    Parâmetros:
+    -----------
+    img_array : numpy.ndarray
+        Array 2D ou 3D (altura, largura, canais) de 8 bits.
+    tamanho_kernel : int
+        Tamanho (ímpar) inicial da janela.
+    tamanho_maximo : int
+        Tamanho (ímpar) máximo da janela.
+
+    Retorna:
+    --------
+    numpy.ndarray
+        Cópia do array com os impulsos substituídos pela mediana.
+    """
+    plano = img_array if img_array.ndim == 3 else img_array[:, :, np.newaxis]
+    altura, largura = plano.shape[:2]
+    ruido = (plano == 0) | (plano == 255)
+    saida = plano.copy()
+
+    def resolver(ys, xs, cs):
+        tamanho = tamanho_kernel
+        while ys.size and tamanho <= tamanho_maximo:
+            limite = tamanho // 2
+            deslocamentos = np.arange(-limite, limite + 1)
+
+            # Vizinhança de cada candidato: (candidatos, tamanho²)
+            ny = (ys[:, np.newaxis, np.newaxis] + deslocamentos[np.newaxis, :, np.newaxis]).reshape(ys.size, -1)
+            nx = (xs[:, np.newaxis, np.newaxis] + deslocamentos[np.newaxis, np.newaxis, :]).reshape(xs.size, -1)
+            dentro = (ny >= 0) & (ny < altura) & (nx >= 0) & (nx < largura)
+            ny = np.clip(ny, 0, altura - 1)
+            nx = np.clip(nx, 0, largura - 1)
+            canal = cs[:, np.newaxis]
+            validos = dentro & ~ruido[ny, nx, canal]
+
+            # Vizinhos inválidos vão para o fim da ordenação
+            valores = np.where(validos, plano[ny, nx, canal].astype(np.int16), 256)
+            valores.sort(axis=1)
+            quantidade = np.count_nonzero(validos, axis=1)
+
+            resolvidos = quantidade > 0
+            mediana = valores[np.arange(ys.size), quantidade // 2]
+            saida[ys[resolvidos], xs[resolvidos], cs[resolvidos]] = mediana[resolvidos]
+
+            ys, xs, cs = ys[~resolvidos], xs[~resolvidos], cs[~resolvidos]
+            tamanho += 2
+
+    # Coordenadas (linha, coluna, canal) dos candidatos, em blocos limitados
+    # pela janela máxima (os arrays de índices são int64)
+    ys, xs, cs = np.nonzero(ruido)
+    bloco = max(1, _BYTES_BLOCO_IMPULSOS // (tamanho_maximo * tamanho_maximo * 8))
+    for inicio in range(0, ys.size, bloco):
+        fim = inicio + bloco
+        resolver(ys[inicio:fim], xs[inicio:fim], cs[inicio:fim])
+
+    return saida if img_array.ndim == 3 else saida[:, :, 0]
+
+# Kernels Laplacianos dos filtros passa-alta
+_KERNELS_LAPLACIANO = {
+    'laplaciano_4': np.array([
+        [0, -1, 0],
+        [-1, 4, -1],
+        [0, -1, 0]
+    ]),
+    'laplaciano_8': np.array([
+        [-1, -1, -1],
+        [-1, 8, -1],
+        [-1, -1, -1]
+    ])
+}
+
+def _kernel_laplaciano(tipo_kernel):
+    """
+    Retorna o kernel Laplaciano pedido (ou o de 4 vizinhos, com um aviso).
+    """
+    if tipo_kernel in _KERNELS_LAPLACIANO:
+        return _KERNELS_LAPLACIANO[tipo_kernel]
+    # Se um tipo inválido for fornecido, usa o padrão (laplaciano_4)
+    print(f"Aviso: Tipo de kernel '{tipo_kernel}' não reconhecido. Usando 'laplaciano_4'.")
+    return _KERNELS_LAPLACIANO['laplaciano_4']
+
+# Pares (suavização, derivada) 3x3 de cada operador de gradiente
+_KERNELS_GRADIENTE = {
+    'sobel': ([1, 2, 1], [-1, 0, 1]),
+    'scharr': ([3, 10, 3], [-1, 0, 1]),
+    'prewitt': ([1, 1, 1], [-1, 0, 1]),
+}
+
+def _kernels_gradiente(tipo_kernel='sobel', tamanho_kernel=3):
+    """
+    Monta os vetores 1-D de suavização e derivada de um operador de gradiente.
+
+    Os kernels 5x5 e 7x7 são obtidos convoluindo repetidamente o par 3x3 com
+    o binômio [1, 2, 1], a mesma construção que gera o Sobel estendido
+    (suavização [1, 4, 6, 4, 1], derivada [-1, -2, 0, 2, 1] no 5x5).
+
+    Parâmetros:
+    -----------
+    tipo_kernel : str
+        'sobel', 'scharr' ou 'prewitt'.
+    tamanho_kernel : int
+        3, 5 ou 7.
+
+    Retorna:
+    --------
+    tuple
+        (suavizacao, derivada) como arrays NumPy.
+    """
+    if tamanho_kernel not in (3, 5, 7):
+        raise ValueError("Tamanho do kernel de gradiente deve ser 3, 5 ou 7")
+
+    suavizacao, derivada = (np.array(v) for v in _KERNELS_GRADIENTE[tipo_kernel])
+    binomio = np.array([1, 2, 1])
+    for _ in range((tamanho_kernel - 3) // 2):
+        suavizacao = np.convolve(suavizacao, binomio)
+        derivada = np.convolve(derivada, binomio)
+
+    return suavizacao, derivada
+
+# Saídas possíveis de `_gradientes`
+_SAIDAS_GRADIENTE = ('gx', 'gy', 'l1', 'l2', 'angulo')
+
+def _gradientes(img_array, saidas=('l2',), operador='sobel', tamanho_kernel=3, niveis_angulo=4,
+                destinos=None):
+    """
+    Calcula o par de derivadas (Gx, Gy) uma vez e produz as saídas pedidas.
+
+    Parâmetros:
+    -----------
+    img_array : numpy.ndarray
+        Array 2D (escala de cinza) em float32.
+    saidas, operador, tamanho_kernel, niveis_angulo, destinos :
+        Mesmos significados de `calcular_gradientes`.
+
+    Retorna:
+    --------
+    dict
+        Nome da saída -> array (o de `destinos`, se informado).
+    """
+    invalidas = set(saidas) - set(_SAIDAS_GRADIENTE)
+    if invalidas:
+        raise ValueError(f"Saídas de gradiente inválidas: {sorted(invalidas)}. Use {_SAIDAS_GRADIENTE}.")
+    destinos = destinos or {}
+
+    # Só calcula as derivadas que alguma saída usa
+    usa_gx = any(nome != 'gy' for nome in saidas)
+    usa_gy = any(nome != 'gx' for nome in saidas)
+
+    if operador == 'roberts':
+        # Diferenças diagonais 2x2; a última linha e a última coluna ficam zeradas
+        gx = np.zeros(img_array.shape, dtype=np.float32)
+        gy = np.zeros(img_array.shape, dtype=np.float32)
+        gx[:-1, :-1] = img_array[:-1, :-1] - img_array[1:, 1:]
+        gy[:-1, :-1] = img_array[:-1, 1:] - img_array[1:, :-1]
+    else:
+        # Kernels separáveis (suavização x derivada)
+        # Gx = suavização (vertical) x derivada (horizontal); para o 3x3 de Sobel:
+        #   [[-1, 0, 1],       [[ 1,  2,  1],
+        #    [-2, 0, 2],   Gy = [ 0,  0,  0],
+        #    [-1, 0, 1]]        [-1, -2, -1]]
+        if operador not in _KERNELS_GRADIENTE:
+            print(f"Aviso: Tipo de kernel '{operador}' não reconhecido. Usando 'sobel'.")
+            operador = 'sobel'
+        suavizacao, derivada = _kernels_gradiente(operador, tamanho_kernel)
+
+        # As bordas de raio k // 2 permanecem zeradas
+        gx = _convolucao_separavel(img_array, suavizacao, derivada) if usa_gx else None
+        gy = _convolucao_separavel(img_array, -derivada, suavizacao) if usa_gy else None
+
+    resultados = {}
+    for nome in saidas:
+        destino = destinos.get(nome)
+        if destino is None:
+            destino = np.empty(img_array.shape, dtype=np.uint8 if nome == 'angulo' else np.float32)
+
+        # As magnitudes são calculadas na precisão do array de destino
+        if nome == 'gx':
+            np.abs(gx, out=destino)
+        elif nome == 'gy':
+            np.abs(gy, out=destino)
+        elif nome == 'l1':
+            np.add(np.abs(gx, dtype=destino.dtype), np.abs(gy, dtype=destino.dtype), out=destino)
+        elif nome == 'l2':
+            np.sqrt(np.square(gx, dtype=destino.dtype) + np.square(gy, dtype=destino.dtype), out=destino)
+        else:
+            # Orientação em [0, 180) graus, quantizada em `niveis_angulo` setores
+            # centrados em 0, 180/n, 2*180/n, ... (θ e θ + 180 são a mesma orientação)
+            setor = np.rint(np.arctan2(gy, gx) * (niveis_angulo / np.pi))
+            np.mod(setor, niveis_angulo, out=setor)
+            destino[...] = setor
+        resultados[nome] = destino
+
+    return resultados
+
+def _gradiente_sobel(img_array, direcao='ambos', tipo_kernel='sobel', tamanho_kernel=3):
+    """
+    Calcula o gradiente de Sobel/Scharr (sem pós-processamento) de um array 2D.
+
+    Parâmetros:
+    -----------
+    img_array : numpy.ndarray
+        Array 2D (escala de cinza) em float32.
+    direcao, tipo_kernel, tamanho_kernel :
+        Mesmos significados de `filtro_sobel`.
+
+    Retorna:
+    --------
+    numpy.ndarray
+        Array float32 com |Gx|, |Gy| ou a magnitude, conforme a direção.
+    """
+    # 'ambos' (magnitude L2) é o padrão
+    saida = {'horizontal': 'gx', 'vertical': 'gy'}.get(direcao, 'l2')
+    return _gradientes(img_array, (saida,), tipo_kernel, tamanho_kernel)[saida]
+
+def _normalizar(img_array, min_val, max_val):
+    """
+    Redimensiona linearmente os valores de [min_val, max_val] para [0, 255].
+
+    Recebe o mínimo e o máximo separadamente para que o processamento em
+    blocos possa usar os extremos globais da imagem.
+    """
+    if max_val - min_val > 0:
+        return 255 * (img_array - min_val) / (max_val - min_val)
+
+    # Evita divisão por zero se todos os pixels forem iguais
+    return np.zeros_like(img_array)
+
+#
+    # Tabelas de consulta (LUT) para operações pontuais
+#
+
+# Todos os níveis de uma imagem de 8 bits, na ordem das entradas das tabelas
+_NIVEIS = np.arange(256)
+
+def _aplicar_tabela(imagem, tabela):
+    """
+    Aplica uma tabela de consulta de 256 entradas a uma imagem de 8 bits.
+
+    Cada pixel é substituído por `tabela[pixel]` numa única leitura indexada,
+    sem converter a imagem para ponto flutuante. Imagens PIL usam
+    `Image.point` (o mesmo mapeamento em todas as bandas); arrays usam
+    indexação do NumPy.
+
+    Parâmetros:
+    -----------
+    imagem : PIL.Image ou numpy.ndarray
+        Imagem de 8 bits.
+    tabela : numpy.ndarray
+        Array uint8 com 256 entradas.
+
+    Retorna:
+    --------
+    PIL.Image ou numpy.ndarray
+        Imagem mapeada, do mesmo tipo da entrada.
+    """
+    if isinstance(imagem, Image.Image):
+        return imagem.point(tabela.tolist() * len(imagem.getbands()))
+    return tabela[imagem]
+
+def _tabela_limiar(limiar):
+    """
+    Tabela da limiarização: 255 para níveis >= limiar, 0 para os demais.
+    """
+    return np.where(_NIVEIS >= limiar, 255, 0).astype(np.uint8)
+
+def _tabela_logaritmica():
+    """
+    Tabela da transformação logarítmica s = c * log(1 + r), com c = 255 / log(256).
+    """
+    c = 255 / np.log(1 + 255)
+    return (c * np.log(1 + _NIVEIS.astype(np.float32))).astype(np.uint8)
+
+def _tabela_multiplicacao(escalar):
+    """
+    Tabela da multiplicação por escalar, com clipping para [0, 255].
+    """
+    return np.clip(_NIVEIS.astype(np.float32) * escalar, 0, 255).astype(np.uint8)
+
+# Pesos da conversão para cinza, um por canal (R, G, B)
+_TABELAS_CINZA = [peso * _NIVEIS.astype(np.float64) for peso in (0.299, 0.587, 0.114)]
+
+#
+    # Progresso e cancelamento
+#
+
+class OperacaoCancelada(Exception):
+    """
+    Levantada quando a função de progresso de um filtro pede a interrupção.
+    """
+
+# Altura das faixas de linhas entre duas notificações de progresso
+_LINHAS_POR_FAIXA = 256
+
+def _notificar(progresso, fracao):
+    """
+    Informa a fração concluída (de 0 a 1) e interrompe a operação se pedido.
+
+    `progresso` é a função opcional aceita pelos filtros: recebe a fração
+    concluída e, se retornar False, a operação é interrompida com
+    `OperacaoCancelada`. Com None, não faz nada.
+    """
+    if progresso is not None and progresso(fracao) is False:
+        raise OperacaoCancelada("Operação cancelada.")
+
+#
+    # Execução em faixas (threads)
+#
+
+def _faixas(altura, threads):
+    """
+    Divide as linhas da imagem em até `threads` faixas horizontais contíguas.
+
+    Retorna:
+    --------
+    list
+        Lista de tuplas (y0, y1).
+    """
+    altura_faixa = max(1, -(-altura // threads))
+    return [(y0, min(y0 + altura_faixa, altura)) for y0 in range(0, altura, altura_faixa)]
+
+def _executar_em_faixas(funcao, img_array, raio=0, threads=1, tipo=np.float32, progresso=None):
+    """
+    Aplica uma função de array em faixas horizontais processadas por threads.
+
+    Cada faixa é entregue à função com `raio` linhas extras acima e abaixo
+    (halo), e só as suas próprias linhas são copiadas para um único array
+    de saída pré-alocado. Como as operações do NumPy liberam o GIL, as
+    faixas são calculadas em paralelo dentro do mesmo processo. O resultado
+    é idêntico ao de aplicar a função no array inteiro.
+
+    Com uma função de progresso, a imagem é dividida em faixas de cerca de
+    `_LINHAS_POR_FAIXA` linhas (mesmo com uma só thread) e o progresso é
+    informado ao fim de cada uma; se a função pedir o cancelamento, as
+    faixas restantes não são calculadas.
+
+    Parâmetros:
+    -----------
+    funcao : função
+        Recebe um array (faixa com halo) e retorna um array de mesmas
+        dimensões espaciais.
+    img_array : numpy.ndarray
+        Array 2D ou 3D de entrada.
+    raio : int
+        Número de linhas de halo que a função precisa.
+    threads : int
+        Número de threads. Com 1, a função é aplicada no array inteiro.
+    tipo : dtype
+        Tipo do array de saída.
+    progresso : função, opcional
+        Ver `_notificar`.
+
+    Retorna:
+    --------
+    numpy.ndarray
+        Resultado com as mesmas dimensões espaciais da entrada.
+    """
+    altura = img_array.shape[0]
+    if progresso is None:
+        if threads <= 1:
+            return funcao(img_array)
+        faixas = _faixas(altura, threads)
+    else:
+        # Faixas bem maiores que o halo, para que a sobreposição custe pouco
+        linhas = max(_LINHAS_POR_FAIXA, 16 * raio)
+        faixas = _faixas(altura, max(threads, -(-altura // linhas)))
+        _notificar(progresso, 0.0)
+
+    saida = np.empty(img_array.shape, dtype=tipo)
+    trava = threading.Lock()
+    interrompida = threading.Event()
+    concluidas = 0
+
+    def processar(faixa):
+        nonlocal concluidas
+        if interrompida.is_set():
+            return
+        y0, y1 = faixa
+        hy0, hy1 = max(y0 - raio, 0), min(y1 + raio, altura)
+        saida[y0:y1] = funcao(img_array[hy0:hy1])[y0 - hy0:y1 - hy0]
+
+        if progresso is not None:
+            # Uma notificação por vez, com a fração sempre crescente
+            with trava:
+                concluidas += 1
+                try:
+                    _notificar(progresso, concluidas / len(faixas))
+                except OperacaoCancelada:
+                    interrompida.set()
+                    raise
+
+    if threads <= 1:
+        for faixa in faixas:
+            processar(faixa)
+    else:
+        with ThreadPoolExecutor(threads) as executor:
+            list(executor.map(processar, faixas))
+
+    return saida
 
 # 1
-def limiarizacao(imagem, limiar):
+def limiarizacao(imagem, limiar, progresso=None):
     """
     Aplica a limiarização binária a uma imagem em escala de cinza.
     
@@ -18,29 +796,29 @@ def limiarizacao(imagem, limiar):
         Imagem de entrada (será convertida para escala de cinza).
     limiar : int
         Valor de limiar (entre 0 e 255).
+    progresso : função, opcional
+        Recebe a fração concluída: 0 antes e 1 depois da passada única
+        sobre a imagem. Se retornar False, o filtro é interrompido com
+        `OperacaoCancelada`. O padrão é None.
     
     Retorna:
     --------
     PIL.Image
         Imagem binarizada (preto e branco).
     """
+    _notificar(progresso, 0.0)
+
     # Garante que a imagem está em modo de escala de cinza
     imagem = imagem.convert("L")
 
-    # Obtém os pixels
-    pixels = list(imagem.getdata())
-
-    # Aplica o limiar: 255 se >= limiar, senão 0
-    binarizada = [255 if px >= limiar else 0 for px in pixels]
-
-    # Cria nova imagem binária
-    img_binaria = Image.new("L", imagem.size)
-    img_binaria.putdata(binarizada)
+    # Aplica o limiar (255 se >= limiar, senão 0) por tabela de consulta
+    imagem_limiarizada = _aplicar_tabela(imagem, _tabela_limiar(limiar))
 
-    return img_binaria
+    _notificar(progresso, 1.0)
+    return imagem_limiarizada
 
 # 2
-def filtro_cinza(imagem):
+def filtro_cinza(imagem, progresso=None):
     """
     Converte uma imagem RGB para escala de cinza utilizando média ponderada.
     
@@ -51,6 +829,10 @@ def filtro_cinza(imagem):
     -----------
     imagem : PIL.Image
         Imagem de entrada (em RGB).
+    progresso : função, opcional
+        Recebe a fração concluída (de 0 a 1) ao fim de cada faixa de
+        linhas; se retornar False, o filtro é interrompido com
+        `OperacaoCancelada`. O padrão é None.
     
     Retorna:
     --------
@@ -58,20 +840,32 @@ def filtro_cinza(imagem):
         Imagem convertida para tons de cinza.
     """
     imagem = imagem.convert("RGB")
-    pixels = list(imagem.getdata())
+    pixels = np.asarray(imagem)
 
-    # Media Ponderada
-    grayscale_pixels = [
-    int(0.299 * r + 0.587 * g + 0.114 * b)
-    for (r, g, b) in pixels
-    ]
+    # Media Ponderada: cada termo vem de uma tabela de 256 entradas por canal,
+    # somados na mesma ordem da fórmula e truncados como int()
+    tabela_r, tabela_g, tabela_b = _TABELAS_CINZA
 
-    img_gray = Image.new('L', imagem.size)
-    img_gray.putdata(grayscale_pixels)
-    return img_gray
+    def media_ponderada(faixa):
+        cinza = tabela_r[faixa[:, :, 0]] + tabela_g[faixa[:, :, 1]]
+        cinza += tabela_b[faixa[:, :, 2]]
+        return cinza
+
+    if progresso is None:
+        cinza = media_ponderada(pixels)
+    else:
+        # Por faixas de linhas, com o progresso informado ao fim de cada uma
+        cinza = np.empty(pixels.shape[:2], dtype=np.float64)
+        faixas = _faixas(pixels.shape[0], -(-pixels.shape[0] // _LINHAS_POR_FAIXA))
+        _notificar(progresso, 0.0)
+        for indice, (y0, y1) in enumerate(faixas):
+            cinza[y0:y1] = media_ponderada(pixels[y0:y1])
+            _notificar(progresso, (indice + 1) / len(faixas))
+
+    return Image.fromarray(cinza.astype(np.uint8))
 
 # 3
-def passa_alta_basico(imagem, tipo_kernel='laplaciano_4'):
+def passa_alta_basico(imagem, tipo_kernel='laplaciano_4', threads=1, progresso=None):
     """
     Aplica um filtro Passa-Alta básico para realçar bordas e detalhes em uma imagem.
 
@@ -96,6 +890,15 @@ def passa_alta_basico(imagem, tipo_kernel='laplaciano_4'):
            [-1,  8, -1],
            [-1, -1, -1]]
 
+    threads : int, opcional
+        Número de threads; a imagem é dividida em faixas horizontais
+        processadas em paralelo. O padrão é 1 (sem threads).
+
+    progresso : função, opcional
+        Recebe a fração concluída (de 0 a 1) ao fim de cada faixa de
+        linhas; se retornar False, o filtro é interrompido com
+        `OperacaoCancelada`. O padrão é None.
+
     Retorna:
     --------
     PIL.Image
@@ -105,65 +908,36 @@ def passa_alta_basico(imagem, tipo_kernel='laplaciano_4'):
     imagem_cinza = imagem.convert("L")
     img_array = np.array(imagem_cinza, dtype=np.float32)
 
-    # 2. Define os kernels disponíveis
-    kernels = {
-        'laplaciano_4': np.array([
-            [0, -1, 0],
-            [-1, 4, -1],
-            [0, -1, 0]
-        ]),
-        'laplaciano_8': np.array([
-            [-1, -1, -1],
-            [-1, 8, -1],
-            [-1, -1, -1]
-        ])
-    }
-
-    # Seleciona o kernel com base no parâmetro
-    if tipo_kernel in kernels:
-        kernel = kernels[tipo_kernel]
-    else:
-        # Se um tipo inválido for fornecido, usa o padrão (laplaciano_4)
-        print(f"Aviso: Tipo de kernel '{tipo_kernel}' não reconhecido. Usando 'laplaciano_4'.")
-        kernel = kernels['laplaciano_4']
+    # 2. Seleciona o kernel (laplaciano_4 se o tipo for inválido)
+    kernel = _kernel_laplaciano(tipo_kernel)
 
-    # 3. Prepara a imagem de saída
-    # Cria um array de zeros com as mesmas dimensões da imagem original
-    altura, largura = img_array.shape
-    img_saida_array = np.zeros_like(img_array)
-
-    # 4. Aplica a convolução
-    # Percorre cada pixel da imagem, ignorando as bordas de 1 pixel
-    for i in range(1, altura - 1):
-        for j in range(1, largura - 1):
-            # Seleciona a vizinhança 3x3 do pixel atual
-            vizinhanca = img_array[i-1:i+2, j-1:j+2]
-            
-            # Aplica a convolução: multiplica a vizinhança pelo kernel e soma os resultados
-            valor_convolucao = np.sum(vizinhanca * kernel)
-            
-            # Atribui o resultado ao pixel correspondente na imagem de saída
-            img_saida_array[i, j] = valor_convolucao
-
-    # 5. Pós-processamento (Clipping)
+    # 3. Aplica a convolução de forma vetorizada
+    # As bordas de 1 pixel permanecem zeradas, como na varredura original
+    img_saida_array = _executar_em_faixas(lambda faixa: _convolucao(faixa, kernel), img_array, 1, threads,
+                                          progresso=progresso)
+
+    # 4. Pós-processamento (Clipping)
     # Garante que todos os valores de pixel estejam no intervalo [0, 255]
     img_saida_array = np.clip(img_saida_array, 0, 255)
 
     # Converte o array de volta para o tipo de dado de imagem (8-bit unsigned integer)
     img_saida_array = img_saida_array.astype(np.uint8)
 
-    # 6. Retorna a imagem final
+    # 5. Retorna a imagem final
     return Image.fromarray(img_saida_array)
 
 # 4 
-def passa_alta_alto_reforco(imagem, fator_k=1.0, tipo_kernel_base='laplaciano_4'):
+def passa_alta_alto_reforco(imagem, fator_k=1.0, tipo_kernel_base='laplaciano_4',
+                            recortar_bordas=False, threads=1, progresso=None):
     """
     Aplica um filtro de realce de alta frequência (alto reforço/high-boost)
     para aumentar a nitidez de uma imagem.
 
-    A técnica consiste em somar a imagem original com uma versão filtrada
-    (mapa de bordas obtido pelo filtro Passa-Alta Básico), resultando em
-    uma imagem com detalhes e contornos mais nítidos.
+    A técnica consiste em somar a imagem original com o seu Laplaciano
+    (mapa de bordas) multiplicado por k, resultando em uma imagem com
+    detalhes e contornos mais nítidos. Tudo é calculado numa única passada
+    sobre um só array em escala de cinza: a convolução e a soma ponderada
+    são feitas no mesmo buffer, sem imagem intermediária.
 
     Parâmetros:
     -----------
@@ -177,44 +951,64 @@ def passa_alta_alto_reforco(imagem, fator_k=1.0, tipo_kernel_base='laplaciano_4'
         - O valor padrão é 1.0.
 
     tipo_kernel_base : str, opcional
-        O tipo de kernel a ser usado pelo filtro Passa-Alta Básico subjacente.
+        O kernel Laplaciano, como no filtro Passa-Alta Básico.
         Pode ser 'laplaciano_4' ou 'laplaciano_8'. O padrão é 'laplaciano_4'.
 
+    recortar_bordas : bool, opcional
+        Se True, o Laplaciano é recortado para [0, 255] antes da soma, como
+        o mapa do Passa-Alta Básico (comportamento anterior: a metade
+        negativa das bordas é descartada e só um lado de cada borda é
+        realçado). O padrão é False (Laplaciano completo, com sinal).
+
+    threads : int, opcional
+        Número de threads; a imagem é dividida em faixas horizontais
+        processadas em paralelo. O padrão é 1 (sem threads).
+
+    progresso : função, opcional
+        Recebe a fração concluída (de 0 a 1) ao fim de cada faixa de
+        linhas; se retornar False, o filtro é interrompido com
+        `OperacaoCancelada`. O padrão é None.
+
     Retorna:
     --------
     PIL.Image
         Uma nova imagem com maior nitidez.
     """
-    # Passo 1: Obter o mapa de bordas usando o filtro básico que já criamos.
-    # Conforme o requisito do projeto, não usamos funções prontas para os algoritmos.
-    mapa_bordas = passa_alta_basico(imagem, tipo_kernel=tipo_kernel_base)
-    
-    # Passo 2: Converter a imagem original e o mapa de bordas para arrays NumPy
+    # Passo 1: Converter a imagem original para escala de cinza uma única vez.
     # Usamos float para evitar problemas de estouro de valor durante a soma.
     original_array = np.array(imagem.convert("L"), dtype=np.float32)
-    bordas_array = np.array(mapa_bordas, dtype=np.float32)
-    
-    # Passo 3: Somar o mapa de bordas (multiplicado pelo fator k) à imagem original.
-    # Imagem Nítida = Imagem Original + (k * Mapa de Bordas)
-    imagem_reforco_array = original_array + (fator_k * bordas_array)
-    
-    # Passo 4: Normalizar o resultado para garantir que os valores fiquem entre 0 e 255.
-    # "Corta" qualquer valor que tenha ficado abaixo de 0 ou acima de 255.
-    imagem_reforco_array = np.clip(imagem_reforco_array, 0, 255)
+    kernel = _kernel_laplaciano(tipo_kernel_base)
+
+    def reforco(faixa):
+        # Passo 2: Mapa de bordas (Laplaciano); as bordas de 1 pixel ficam zeradas
+        bordas = _convolucao(faixa, kernel)
+        if recortar_bordas:
+            np.clip(bordas, 0, 255, out=bordas)
+        
+        # Passo 3: Imagem Nítida = Imagem Original + (k * Mapa de Bordas), no mesmo buffer
+        bordas *= fator_k
+        bordas += faixa
+        
+        # Passo 4: "Corta" qualquer valor que tenha ficado abaixo de 0 ou acima de 255.
+        return np.clip(bordas, 0, 255, out=bordas)
+
+    imagem_reforco_array = _executar_em_faixas(reforco, original_array, 1, threads, progresso=progresso)
     
-    # Converte o array de volta para o tipo de imagem (inteiro de 8 bits sem sinal)
-    imagem_final_array = imagem_reforco_array.astype(np.uint8)
-    
-    # Passo 5: Retornar a imagem final a partir do array.
-    return Image.fromarray(imagem_final_array)
+    # Passo 5: Retornar a imagem final (inteiro de 8 bits sem sinal).
+    return Image.fromarray(imagem_reforco_array.astype(np.uint8))
 
 # 5
-def passa_baixa_media(imagem, tamanho_kernel):
+def passa_baixa_media(imagem, tamanho_kernel, threads=1, progresso=None):
     """
     Aplica um filtro passa-baixa usando média aritmética (implementação manual).
     
     O filtro substitui cada pixel pela média dos pixels em sua vizinhança,
     definida pelo tamanho do kernel. Suaviza a imagem e reduz ruídos.
+    Nas bordas, a média considera apenas os vizinhos dentro da imagem.
+
+    As somas das janelas são obtidas de uma imagem integral (tabela de somas
+    acumuladas), então o custo por pixel é constante para qualquer tamanho
+    de kernel.
     
     Parâmetros:
     -----------
@@ -222,6 +1016,13 @@ def passa_baixa_media(imagem, tamanho_kernel):
         Imagem de entrada
     tamanho_kernel : int
         Tamanho do kernel (deve ser ímpar). Default = 3
+    threads : int, opcional
+        Número de threads para processar faixas horizontais em paralelo.
+        Default = 1
+    progresso : função, opcional
+        Recebe a fração concluída (de 0 a 1) ao fim de cada faixa de
+        linhas; se retornar False, o filtro é interrompido com
+        `OperacaoCancelada`. Default = None
     
     Retorna:
     --------
@@ -236,74 +1037,33 @@ def passa_baixa_media(imagem, tamanho_kernel):
     if tamanho_kernel < 3 or tamanho_kernel % 2 == 0:
         raise ValueError("Tamanho do kernel deve ser ímpar e >= 3")
     
-    # Converte para float para evitar overflow
-    img_float = img_array.astype(np.float32)
-    
-    altura, largura = img_float.shape[:2]
-    limite = tamanho_kernel // 2  # Raio do kernel
-    
-    # Cria imagem de saída
-    if len(img_float.shape) == 3:  # Imagem colorida
-        img_saida = np.zeros_like(img_float)
-        canais = img_float.shape[2]
-    else:  # Imagem em escala de cinza
-        img_saida = np.zeros((altura, largura), dtype=np.float32)
-        canais = 1
-    
-    # Aplica o filtro de média manualmente
-    for x in range(altura):
-        for y in range(largura):
-            
-            if len(img_float.shape) == 3:  # Imagem colorida
-                for canal in range(canais):
-                    soma = 0.0
-                    contador = 0
-                    
-                    # Percorre a vizinhança do pixel
-                    for i in range(-limite, limite + 1):
-                        for j in range(-limite, limite + 1):
-                            # Coordenadas do pixel vizinho
-                            nx = x + i
-                            ny = y + j
-                            
-                            # Verifica se está dentro dos limites da imagem
-                            if 0 <= nx < altura and 0 <= ny < largura:
-                                soma += img_float[nx, ny, canal]
-                                contador += 1
-                    
-                    # Calcula a média
-                    img_saida[x, y, canal] = soma / contador
-                    
-            else:  # Imagem em escala de cinza
-                soma = 0.0
-                contador = 0
-                
-                # Percorre a vizinhança do pixel
-                for i in range(-limite, limite + 1):
-                    for j in range(-limite, limite + 1):
-                        # Coordenadas do pixel vizinho
-                        nx = x + i
-                        ny = y + j
-                        
-                        # Verifica se está dentro dos limites da imagem
-                        if 0 <= nx < altura and 0 <= ny < largura:
-                            soma += img_float[nx, ny]
-                            contador += 1
-                
-                # Calcula a média
-                img_saida[x, y] = soma / contador
+    # Calcula a média de todos os canais de uma vez
+    img_saida = _executar_em_faixas(lambda faixa: _media_caixa(faixa, tamanho_kernel),
+                                    img_array, tamanho_kernel // 2, threads, progresso=progresso)
     
     # Converte de volta para uint8 e retorna como PIL Image
     img_saida = np.clip(img_saida, 0, 255).astype(np.uint8)
     return Image.fromarray(img_saida)
 
 # 6
-def passa_baixa_mediana(imagem, tamanho_kernel):
+def passa_baixa_mediana(imagem, tamanho_kernel, modo='completo', tamanho_maximo=7, threads=1,
+                        progresso=None):
     """
     Aplica um filtro passa-baixa usando mediana (implementação manual).
     
     O filtro substitui cada pixel pela mediana dos pixels em sua vizinhança.
-    É eficaz para remover ruído impulsivo preservando bordas.
+    É eficaz para remover ruído impulsivo preservando bordas. Nas bordas,
+    a mediana considera apenas os vizinhos dentro da imagem (para uma
+    quantidade par de vizinhos, usa o elemento de índice n // 2 da lista
+    ordenada).
+
+    Kernels pequenos ordenam os valores de cada janela, em faixas de
+    linhas. Em imagens de 8 bits com kernels maiores que
+    `_KERNEL_MAXIMO_ORDENACAO`, a mediana é obtida de histogramas de
+    intensidade atualizados enquanto a janela desliza (método de
+    Perreault-Hébert), então o custo por pixel não cresce com o tamanho do
+    kernel. Imagens de 16 bits, 32 bits ou ponto flutuante (modos 'I;16',
+    'I' e 'F') sempre ordenam.
     
     Parâmetros:
     -----------
@@ -311,6 +1071,22 @@ def passa_baixa_mediana(imagem, tamanho_kernel):
         Imagem de entrada
     tamanho_kernel : int
         Tamanho do kernel (deve ser ímpar). Default = 3
+    modo : str, opcional
+        - 'completo': Filtra todos os pixels da imagem. Padrão.
+        - 'impulsos': Filtra apenas os pixels com valor 0 ou 255 (candidatos
+          a ruído sal e pimenta, como os gerados por `filtro_ruidos`), usando
+          só os vizinhos que não são ruído. Os demais pixels não são alterados.
+          Só para imagens de 8 bits.
+    tamanho_maximo : int, opcional
+        No modo 'impulsos', tamanho máximo até o qual a janela cresce (de 2
+        em 2) quando todos os vizinhos de um pixel são ruído. Default = 7
+    threads : int, opcional
+        Número de threads para processar faixas horizontais em paralelo.
+        Default = 1
+    progresso : função, opcional
+        Recebe a fração concluída (de 0 a 1) ao fim de cada faixa de
+        linhas; se retornar False, o filtro é interrompido com
+        `OperacaoCancelada`. Default = None
     
     Retorna:
     --------
@@ -325,77 +1101,39 @@ def passa_baixa_mediana(imagem, tamanho_kernel):
     if tamanho_kernel < 3 or tamanho_kernel % 2 == 0:
         raise ValueError("Tamanho do kernel deve ser ímpar e >= 3")
     
-    altura, largura = img_array.shape[:2]
-    limite = tamanho_kernel // 2  # Raio do kernel
-    
+    # Mediana seletiva: só os candidatos a ruído impulsivo são recalculados
+    if modo == 'impulsos':
+        if tamanho_maximo < tamanho_kernel:
+            raise ValueError("Tamanho máximo deve ser >= tamanho do kernel")
+        if img_array.dtype != np.uint8:
+            raise ValueError("O modo 'impulsos' requer uma imagem de 8 bits")
+        # O halo cobre a maior janela, então as faixas dão o mesmo resultado
+        img_saida = _executar_em_faixas(
+            lambda faixa: _mediana_impulsos(faixa, tamanho_kernel, tamanho_maximo),
+            img_array, tamanho_maximo // 2, threads, img_array.dtype, progresso)
+        return Image.fromarray(img_saida)
+
     # Cria imagem de saída
     if len(img_array.shape) == 3:  # Imagem colorida
         img_saida = np.zeros_like(img_array)
-        canais = img_array.shape[2]
     else:  # Imagem em escala de cinza
-        img_saida = np.zeros((altura, largura), dtype=np.uint8)
-        canais = 1
+        img_saida = np.zeros(img_array.shape, dtype=np.uint8)
     
-    # Aplica o filtro de mediana manualmente
-    for x in range(altura):
-        for y in range(largura):
-            
-            if len(img_array.shape) == 3:  # Imagem colorida
-                for canal in range(canais):
-                    valores = []
-                    
-                    # Coleta valores da vizinhança do pixel
-                    for i in range(-limite, limite + 1):
-                        for j in range(-limite, limite + 1):
-                            # Coordenadas do pixel vizinho
-                            nx = x + i
-                            ny = y + j
-                            
-                            # Verifica se está dentro dos limites da imagem
-                            if 0 <= nx < altura and 0 <= ny < largura:
-                                valores.append(img_array[nx, ny, canal])
-                    
-                    # Ordena os valores manualmente (bubble sort simples)
-                    n = len(valores)
-                    for i in range(n):
-                        for j in range(0, n - i - 1):
-                            if valores[j] > valores[j + 1]:
-                                valores[j], valores[j + 1] = valores[j + 1], valores[j]
-                    
-                    # Encontra a mediana
-                    mediana_idx = len(valores) // 2
-                    img_saida[x, y, canal] = valores[mediana_idx]
-                    
-            else:  # Imagem em escala de cinza
-                valores = []
-                
-                # Coleta valores da vizinhança do pixel
-                for i in range(-limite, limite + 1):
-                    for j in range(-limite, limite + 1):
-                        # Coordenadas do pixel vizinho
-                        nx = x + i
-                        ny = y + j
-                        
-                        # Verifica se está dentro dos limites da imagem
-                        if 0 <= nx < altura and 0 <= ny < largura:
-                            valores.append(img_array[nx, ny])
-                
-                # Ordena os valores manualmente (bubble sort simples)
-                n = len(valores)
-                for i in range(n):
-                    for j in range(0, n - i - 1):
-                        if valores[j] > valores[j + 1]:
-                            valores[j], valores[j + 1] = valores[j + 1], valores[j]
-                
-                # Encontra a mediana
-                mediana_idx = len(valores) // 2
-                img_saida[x, y] = valores[mediana_idx]
+    # Calcula a mediana de todos os canais de uma vez (histogramas só em 8 bits
+    # e para kernels grandes, em que ordenar as janelas fica mais caro)
+    if img_array.dtype == np.uint8 and tamanho_kernel > _KERNEL_MAXIMO_ORDENACAO:
+        mediana = _mediana_histograma
+    else:
+        mediana = _mediana_ordenacao
+    img_saida[...] = _executar_em_faixas(lambda faixa: mediana(faixa, tamanho_kernel),
+                                         img_array, tamanho_kernel // 2, threads, img_saida.dtype,
+                                         progresso)
 
     # Retorna como PIL Image
     return Image.fromarray(img_saida)
 
 # 7
-def filtro_roberts(imagem):
+def filtro_roberts(imagem, progresso=None):
     """
     Aplica o operador de detecção de bordas de Roberts em uma imagem.
     
@@ -407,6 +1145,10 @@ def filtro_roberts(imagem):
     -----------
     imagem : PIL.Image
         Imagem de entrada (será convertida para tons de cinza).
+    progresso : função, opcional
+        Recebe a fração concluída (de 0 a 1) ao fim de cada faixa de
+        linhas; se retornar False, o filtro é interrompido com
+        `OperacaoCancelada`. O padrão é None.
     
     Retorna:
     --------
@@ -414,31 +1156,18 @@ def filtro_roberts(imagem):
         Imagem com bordas detectadas usando o operador de Roberts.
     """
     imagem = imagem.convert("L")  # Garantir escala de cinza
-    largura, altura = imagem.size
-    pixels = imagem.load()
-
-    nova_img = Image.new("L", (largura, altura))
-    novo_pixels = nova_img.load()
-
-    for y in range(altura - 1):
-        for x in range(largura - 1):
-            p = pixels[x, y]
-            px1 = pixels[x+1, y]
-            px2 = pixels[x, y+1]
-            px3 = pixels[x+1, y+1]
+    img_array = np.array(imagem, dtype=np.float32)
 
-            Gx = int(p - px3)
-            Gy = int(px1 - px2)
+    # Gx = p(x, y) - p(x+1, y+1) e Gy = p(x+1, y) - p(x, y+1), calculados de uma vez;
+    # magnitude do gradiente (versão mais rápida: valor absoluto), limitada a 255
+    magnitude = _executar_em_faixas(lambda faixa: _gradientes(faixa, ('l1',), 'roberts')['l1'],
+                                    img_array, 1, progresso=progresso)
+    np.minimum(magnitude, 255, out=magnitude)
 
-            # Magnitude do gradiente (versão mais rápida: valor absoluto)
-            magnitude = min(255, abs(Gx) + abs(Gy))
-
-            novo_pixels[x, y] = magnitude
-
-    return nova_img
+    return Image.fromarray(magnitude.astype(np.uint8))
 
 # 8
-def filtro_prewitt(imagem):
+def filtro_prewitt(imagem, progresso=None):
     """
     Aplica o filtro de Prewitt para detecção de bordas em uma imagem em escala de cinza.
 
@@ -451,6 +1180,11 @@ def filtro_prewitt(imagem):
     imagem : PIL.Image
         Imagem de entrada (será convertida para escala de cinza se necessário).
 
+    progresso : função, opcional
+        Recebe a fração concluída (de 0 a 1) ao fim de cada faixa de
+        linhas; se retornar False, o filtro é interrompido com
+        `OperacaoCancelada`. O padrão é None.
+
     Retorna:
     --------
     PIL.Image
@@ -458,51 +1192,33 @@ def filtro_prewitt(imagem):
     """
     # Garante que a imagem está em modo de escala de cinza
     imagem = imagem.convert("L")
-    largura, altura = imagem.size
-    pixels = imagem.load()
-
-    # Define os kernels Gx e Gy
-    Gx = [[-1, 0, 1],
-          [-1, 0, 1],
-          [-1, 0, 1]]
-
-    Gy = [[ 1,  1,  1],
-          [ 0,  0,  0],
-          [-1, -1, -1]]
+    img_array = np.array(imagem, dtype=np.float32)
 
-    # Cria nova imagem de saída
-    nova_img = Image.new("L", (largura, altura))
-    novo_pixels = nova_img.load()
+    # Kernels Gx e Gy (aplicados como suavização x derivada, ignorando bordas):
+    #   Gx = [[-1, 0, 1],    Gy = [[ 1,  1,  1],
+    #         [-1, 0, 1],          [ 0,  0,  0],
+    #         [-1, 0, 1]]          [-1, -1, -1]]
+    # Calcula a magnitude do gradiente em float64 (truncada, como int())
+    def magnitude_prewitt(faixa):
+        destino = np.empty(faixa.shape, dtype=np.float64)
+        return _gradientes(faixa, ('l2',), 'prewitt', destinos={'l2': destino})['l2']
 
-    # Aplica convolução (ignorando bordas)
-    for y in range(1, altura - 1):
-        for x in range(1, largura - 1):
-            soma_x = 0
-            soma_y = 0
+    magnitude = _executar_em_faixas(magnitude_prewitt, img_array, 1, tipo=np.float64, progresso=progresso)
+    magnitude = np.minimum(255, np.floor(magnitude))
 
-            # Aplica os kernels na vizinhança 3x3
-            for i in range(3):
-                for j in range(3):
-                    px = pixels[x + j - 1, y + i - 1]
-                    soma_x += Gx[i][j] * px
-                    soma_y += Gy[i][j] * px
-
-            # Calcula a magnitude do gradiente
-            magnitude = math.sqrt(soma_x**2 + soma_y**2)
-            magnitude = min(255, int(magnitude))
-
-            novo_pixels[x, y] = magnitude
-
-    return nova_img
+    return Image.fromarray(magnitude.astype(np.uint8))
 
 # 9
-def filtro_sobel(imagem, direcao='ambos', pos_processamento='clipping'):
+def filtro_sobel(imagem, direcao='ambos', pos_processamento='clipping',
+                 tipo_kernel='sobel', tamanho_kernel=3, threads=1, progresso=None):
     """
     Aplica o operador de Sobel para detectar e realçar bordas em uma imagem.
 
-    O algoritmo utiliza dois kernels 3x3 para calcular o gradiente em cada pixel,
+    O algoritmo utiliza dois kernels para calcular o gradiente em cada pixel,
     um para a direção horizontal (Gx) e outro para a vertical (Gy). O resultado
     pode ser a magnitude do gradiente ou o gradiente em uma das direções.
+    Como os kernels são separáveis, cada um é aplicado em dois passes 1-D
+    (suavização e derivada), de modo que kernels maiores custam O(k) por pixel.
 
     Parâmetros:
     -----------
@@ -521,6 +1237,26 @@ def filtro_sobel(imagem, direcao='ambos', pos_processamento='clipping'):
         - 'clipping': Limita os valores ao intervalo [0, 255]. Padrão.
         - 'normalizacao': Redimensiona todos os valores para o intervalo [0, 255].
 
+    tipo_kernel : str, opcional
+        Família do operador de gradiente:
+        - 'sobel': Suavização [1, 2, 1]. Padrão.
+        - 'scharr': Suavização [3, 10, 3], com melhor simetria rotacional.
+        - 'prewitt': Suavização [1, 1, 1] (no 3x3, o mesmo de `filtro_prewitt`).
+
+    tamanho_kernel : int, opcional
+        Tamanho dos kernels: 3 (padrão), 5 ou 7. Kernels maiores respondem
+        a bordas mais largas e são menos sensíveis a ruído; como os valores
+        crescem com o tamanho, 'normalizacao' costuma ser mais adequada.
+
+    threads : int, opcional
+        Número de threads; a imagem é dividida em faixas horizontais
+        processadas em paralelo. O padrão é 1 (sem threads).
+
+    progresso : função, opcional
+        Recebe a fração concluída (de 0 a 1) ao fim de cada faixa de
+        linhas; se retornar False, o filtro é interrompido com
+        `OperacaoCancelada`. O padrão é None.
+
     Retorna:
     --------
     PIL.Image
@@ -529,61 +1265,104 @@ def filtro_sobel(imagem, direcao='ambos', pos_processamento='clipping'):
     # 1. Converte para escala de cinza e para array NumPy de ponto flutuante
     imagem_cinza = imagem.convert("L")
     img_array = np.array(imagem_cinza, dtype=np.float32)
-    altura, largura = img_array.shape
-    img_saida_array = np.zeros_like(img_array)
 
-    # 2. Define os kernels de Sobel
-    kernel_gx = np.array([
-        [-1, 0, 1],
-        [-2, 0, 2],
-        [-1, 0, 1]
-    ])
-    kernel_gy = np.array([
-        [1, 2, 1],
-        [0, 0, 0],
-        [-1, -2, -1]
-    ])
+    # 2. Calcula o gradiente na direção escolhida
+    img_saida_array = _executar_em_faixas(
+        lambda faixa: _gradiente_sobel(faixa, direcao, tipo_kernel, tamanho_kernel),
+        img_array, tamanho_kernel // 2, threads, progresso=progresso)
 
-    # 3. Aplica a convolução na imagem
-    # Percorre cada pixel, ignorando as bordas de 1 pixel
-    for i in range(1, altura - 1):
-        for j in range(1, largura - 1):
-            # Extrai a vizinhança 3x3
-            vizinhanca = img_array[i-1:i+2, j-1:j+2]
-            
-            # Aplica os kernels Gx e Gy
-            gx = np.sum(vizinhanca * kernel_gx)
-            gy = np.sum(vizinhanca * kernel_gy)
-            
-            valor_final = 0
-            # Calcula o valor final com base na direção escolhida
-            if direcao == 'horizontal':
-                valor_final = abs(gx)
-            elif direcao == 'vertical':
-                valor_final = abs(gy)
-            else: # 'ambos' é o padrão
-                valor_final = np.sqrt(gx**2 + gy**2)
-            
-            img_saida_array[i, j] = valor_final
-
-    # 4. Aplica o pós-processamento
+    # 3. Aplica o pós-processamento
     if pos_processamento == 'normalizacao':
-        min_val = np.min(img_saida_array)
-        max_val = np.max(img_saida_array)
-        if max_val - min_val > 0:
-            img_saida_array = 255 * (img_saida_array - min_val) / (max_val - min_val)
-        else:
-            # Evita divisão por zero se todos os pixels forem iguais
-            img_saida_array = np.zeros_like(img_array)
+        img_saida_array = _normalizar(img_saida_array, np.min(img_saida_array), np.max(img_saida_array))
     else: # 'clipping' é o padrão
         img_saida_array = np.clip(img_saida_array, 0, 255)
 
-    # 5. Converte o array de volta para imagem e retorna
+    # 4. Converte o array de volta para imagem e retorna
     img_saida_array = img_saida_array.astype(np.uint8)
     return Image.fromarray(img_saida_array)
 
+def calcular_gradientes(imagem, saidas=('l2',), operador='sobel', tamanho_kernel=3,
+                        niveis_angulo=4, destinos=None, progresso=None):
+    """
+    Calcula o par de derivadas (Gx, Gy) uma única vez e devolve vários mapas.
+
+    Os filtros de Sobel, Prewitt e Roberts são vistas sobre esta função: em
+    vez de chamar `filtro_sobel` três vezes (uma por direção) e depois os
+    outros operadores, peça todas as saídas de uma vez, e a imagem só é
+    convertida e convoluída uma vez por operador. Os resultados são
+    escritos em arrays pré-alocados (os de `destinos` ou novos).
+
+    Parâmetros:
+    -----------
+    imagem : PIL.Image ou numpy.ndarray
+        Imagem de entrada (convertida para escala de cinza) ou array 2D.
+
+    saidas : iterável de str, opcional
+        Mapas a calcular:
+        - 'gx': |Gx|, valor absoluto da derivada horizontal.
+        - 'gy': |Gy|, valor absoluto da derivada vertical.
+        - 'l1': magnitude |Gx| + |Gy|.
+        - 'l2': magnitude sqrt(Gx² + Gy²). Padrão.
+        - 'angulo': orientação do gradiente quantizada (uint8): o setor k
+          corresponde a k * 180 / niveis_angulo graus, medidos a partir do
+          eixo x com o eixo y para cima (o sinal de Gy de `filtro_sobel`).
+
+    operador : str, opcional
+        'sobel' (padrão), 'scharr', 'prewitt' ou 'roberts' (2x2 diagonal).
+
+    tamanho_kernel : int, opcional
+        3 (padrão), 5 ou 7, para Sobel, Scharr e Prewitt.
+
+    niveis_angulo : int, opcional
+        Número de setores da orientação. O padrão é 4 (0, 45, 90 e 135 graus).
+
+    destinos : dict, opcional
+        Arrays pré-alocados (altura, largura) por nome de saída. As
+        magnitudes são calculadas na precisão do array de destino (float32
+        por padrão); a orientação usa um array inteiro (uint8 por padrão).
+
+    progresso : função, opcional
+        Recebe a fração concluída (de 0 a 1) ao fim de cada faixa de
+        linhas; se retornar False, o cálculo é interrompido com
+        `OperacaoCancelada`. O padrão é None (imagem inteira de uma vez).
+
+    Retorna:
+    --------
+    dict
+        Nome da saída -> array. As bordas sem vizinhança completa valem 0.
+    """
+    if isinstance(imagem, Image.Image):
+        img_array = np.array(imagem.convert("L"), dtype=np.float32)
+    else:
+        img_array = np.asarray(imagem, dtype=np.float32)
+    saidas = tuple(saidas)
+    if progresso is None:
+        return _gradientes(img_array, saidas, operador, tamanho_kernel, niveis_angulo, destinos)
+
+    # Por faixas com halo: cada faixa calcula todas as saídas em arrays do
+    # mesmo tipo dos destinos e copia só as suas linhas
+    altura = img_array.shape[0]
+    raio = 1 if operador == 'roberts' else tamanho_kernel // 2
+    resultados = dict(destinos or {})
+    for nome in saidas:
+        if resultados.get(nome) is None:
+            resultados[nome] = np.empty(img_array.shape, dtype=np.uint8 if nome == 'angulo' else np.float32)
+
+    faixas = _faixas(altura, -(-altura // max(_LINHAS_POR_FAIXA, 16 * raio)))
+    _notificar(progresso, 0.0)
+    for indice, (y0, y1) in enumerate(faixas):
+        hy0, hy1 = max(y0 - raio, 0), min(y1 + raio, altura)
+        parciais = {nome: np.empty((hy1 - hy0,) + img_array.shape[1:], dtype=resultados[nome].dtype)
+                    for nome in saidas}
+        _gradientes(img_array[hy0:hy1], saidas, operador, tamanho_kernel, niveis_angulo, parciais)
+        for nome in saidas:
+            resultados[nome][y0:y1] = parciais[nome][y0 - hy0:y1 - hy0]
+        _notificar(progresso, (indice + 1) / len(faixas))
+
+    return {nome: resultados[nome] for nome in saidas}
+
 # 10
-def transformacao_logaritmica(imagem):
+def transformacao_logaritmica(imagem, progresso=None):
     """
     Aplica uma transformação logarítmica para realçar detalhes em
     regiões escuras da imagem.
@@ -599,34 +1378,35 @@ def transformacao_logaritmica(imagem):
         A imagem de entrada que será processada. A função a converterá
         internamente para escala de cinza.
 
+    progresso : função, opcional
+        Recebe a fração concluída: 0 antes e 1 depois da passada única
+        sobre a imagem. Se retornar False, o filtro é interrompido com
+        `OperacaoCancelada`. O padrão é None.
+
     Retorna:
     --------
     PIL.Image
         Uma nova imagem com o contraste ajustado pela transformação logarítmica.
     """
-    # 1. Converte a imagem para escala de cinza e para um array NumPy
-    # Usamos float para permitir os cálculos com o logaritmo.
-    imagem_cinza = imagem.convert("L")
-    img_array = np.array(imagem_cinza, dtype=np.float32)
+    _notificar(progresso, 0.0)
 
-    # 2. Calcula a constante de escala 'c'
-    # O valor 255 é o nível máximo de intensidade de uma imagem de 8 bits.
-    # np.log(1 + 255) nos dá o valor máximo que a função log pode atingir.
-    # 'c' normaliza esse valor para que a saída máxima seja 255.
-    c = 255 / np.log(1 + 255)
+    # 1. Converte a imagem para escala de cinza
+    imagem_cinza = imagem.convert("L")
 
-    # 3. Aplica a transformação logarítmica a cada pixel
-    # A fórmula é aplicada a todos os elementos do array de uma só vez.
-    log_array = c * np.log(1 + img_array)
+    # 2. Calcula a transformação para os 256 níveis possíveis
+    # A constante 'c' = 255 / log(1 + 255) normaliza a saída máxima para 255.
+    # Como a saída depende só do nível do pixel, o logaritmo é calculado
+    # uma vez por nível, e não uma vez por pixel.
+    tabela = _tabela_logaritmica()
 
-    # 4. Converte o array de volta para o tipo de dado de imagem (8-bit)
-    # e depois para um objeto de imagem PIL para ser retornado.
-    img_saida_array = log_array.astype(np.uint8)
+    # 3. Aplica a tabela a todos os pixels de uma só vez
+    imagem_log = _aplicar_tabela(imagem_cinza, tabela)
 
-    return Image.fromarray(img_saida_array)
+    _notificar(progresso, 1.0)
+    return imagem_log
 
 # 11
-def operacoes_aritmeticas(imagem1, operacao, imagem2=None, escalar=None):
+def operacoes_aritmeticas(imagem1, operacao, imagem2=None, escalar=None, progresso=None):
     """
     Aplica operações aritméticas entre imagens ou com valor escalar.
     
@@ -644,13 +1424,27 @@ def operacoes_aritmeticas(imagem1, operacao, imagem2=None, escalar=None):
         Segunda imagem, obrigatória para soma e subtração.
     escalar : float, opcional
         Valor escalar para multiplicação.
+    progresso : função, opcional
+        Recebe a fração concluída: 0 antes e 1 depois da passada única
+        sobre a imagem. Se retornar False, o filtro é interrompido com
+        `OperacaoCancelada`. O padrão é None.
 
     Retorna:
     --------
     PIL.Image
         Imagem resultante da operação aritmética com valores entre 0 e 255.
     """
+    _notificar(progresso, 0.0)
     imagem1 = imagem1.convert("L")
+
+    if operacao == "multiplicacao":
+        if escalar is None:
+            raise ValueError("É necessário fornecer um valor escalar para a multiplicação.")
+        # Operação pontual: tabela de consulta com clipping para [0, 255]
+        imagem_resultante = _aplicar_tabela(imagem1, _tabela_multiplicacao(escalar))
+        _notificar(progresso, 1.0)
+        return imagem_resultante
+
     arr1 = np.array(imagem1, dtype=np.float32)
 
     if operacao == "soma":
@@ -667,11 +1461,6 @@ def operacoes_aritmeticas(imagem1, operacao, imagem2=None, escalar=None):
         arr2 = np.array(imagem2, dtype=np.float32)
         resultado = arr1 - arr2
 
-    elif operacao == "multiplicacao":
-        if escalar is None:
-            raise ValueError("É necessário fornecer um valor escalar para a multiplicação.")
-        resultado = arr1 * escalar
-
     else:
         raise ValueError("Operação inválida. Use: 'soma', 'subtracao' ou 'multiplicacao'.")
 
@@ -680,10 +1469,66 @@ def operacoes_aritmeticas(imagem1, operacao, imagem2=None, escalar=None):
 
     # Converte de volta para imagem
     imagem_resultante = Image.fromarray(resultado, mode="L")
+    _notificar(progresso, 1.0)
+    return imagem_resultante
+
+def operacao_com_segunda_imagem(imagem1, imagem2, operacao, escalar=1.0, progresso=None):
+    """
+    Combina duas imagens coloridas, ponderando a segunda por um escalar.
+
+    É a operação "Operações Aritméticas" da interface e do processamento em
+    lote: a segunda imagem é redimensionada para o tamanho da primeira e o
+    resultado é calculado por canal RGB, com clipping para [0, 255].
+
+    Parâmetros:
+    -----------
+    imagem1 : PIL.Image
+        Imagem base.
+    imagem2 : PIL.Image
+        Segunda imagem.
+    operacao : str
+        "soma" (imagem1 + escalar * imagem2), "subtracao"
+        (imagem1 - escalar * imagem2) ou "multiplicacao"
+        (imagem1 * escalar * imagem2).
+    escalar : float, opcional
+        Peso da segunda imagem. O padrão é 1.0.
+    progresso : função, opcional
+        Recebe a fração concluída: 0 antes e 1 depois da passada única
+        sobre a imagem. Se retornar False, o filtro é interrompido com
+        `OperacaoCancelada`. O padrão é None.
+
+    Retorna:
+    --------
+    PIL.Image
+        Imagem RGB resultante.
+    """
+    if imagem2 is None:
+        raise ValueError("É necessário fornecer uma segunda imagem para as operações aritméticas.")
+    if operacao not in ("soma", "subtracao", "multiplicacao"):
+        raise ValueError("Operação inválida. Use: 'soma', 'subtracao' ou 'multiplicacao'.")
+    _notificar(progresso, 0.0)
+
+    # Preparar as imagens para operação
+    imagem1 = imagem1.convert("RGB")
+    imagem2 = imagem2.convert("RGB").resize(imagem1.size)
+
+    np1 = np.array(imagem1).astype(np.float32)
+    np2 = np.array(imagem2).astype(np.float32)
+
+    if operacao == "soma":
+        resultado_np = np.clip(np1 + escalar * np2, 0, 255)
+    elif operacao == "subtracao":
+        resultado_np = np.clip(np1 - escalar * np2, 0, 255)
+    else: # "multiplicacao"
+        resultado_np = np.clip(np1 * escalar * np2, 0, 255)
+
+    imagem_resultante = Image.fromarray(resultado_np.astype(np.uint8))
+    _notificar(progresso, 1.0)
     return imagem_resultante
 
 # 12
-def filtro_ruidos(imagem, taxa_ruido=0.05):
+def filtro_ruidos(imagem, taxa_ruido=0.05, progresso=None):
+    _notificar(progresso, 0.0)
     img_array = np.array(imagem).copy()
 
     if img_array.ndim == 2:
@@ -699,6 +1544,7 @@ def filtro_ruidos(imagem, taxa_ruido=0.05):
 
     num_pixels_ruido = int(taxa_ruido * altura * largura)
     if num_pixels_ruido <= 0:
+        _notificar(progresso, 1.0)
         return imagem.copy()
 
     num_salt = num_pixels_ruido // 2
@@ -712,4 +1558,5 @@ def filtro_ruidos(imagem, taxa_ruido=0.05):
     img_array[coords_salt] = valor_salt
     img_array[coords_pepper] = valor_pepper
 
+    _notificar(progresso, 1.0)
     return Image.fromarray(img_array)
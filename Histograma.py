@@ -3,8 +3,11 @@ import matplotlib.pyplot as plt
 import numpy as np
 import cv2
 import threading
+import multiprocessing
 
 from Filtros import *
+from Filtros import _faixas, _executar_em_faixas, _aplicar_tabela, _notificar, _NIVEIS
+from concurrent.futures import ThreadPoolExecutor
 
 #
     # Histograma
@@ -16,18 +19,24 @@ def gerar_histograma(imagem_cinza):
     Gera e exibe o histograma de uma imagem em escala de cinza.
     
     Parâmetros:
-    imagem_cinza (PIL.Image): Imagem PIL em escala de cinza
+    imagem_cinza (PIL.Image ou HistogramaAcumulado): Imagem PIL em escala de
+        cinza, ou um histograma já acumulado (de uma imagem grande ou de um
+        conjunto de imagens)
     
     Retorna:
     None - Apenas exibe o gráfico do histograma
     """
-    # Converter a imagem PIL para array numpy
-    img_array = np.array(imagem_cinza)
-    
-    # Calcular o histograma usando numpy
-    # bins=256 para representar todos os níveis de cinza (0-255)
-    # range=[0,256] define o intervalo de valores considerados
-    histograma, bins = np.histogram(img_array.flatten(), bins=256, range=[0,256])
+    if isinstance(imagem_cinza, HistogramaAcumulado):
+        # Contagens já acumuladas (canal de cinza ou o primeiro canal RGB)
+        histograma, bins = imagem_cinza.contagens[0], np.arange(257)
+    else:
+        # Converter a imagem PIL para array numpy
+        img_array = np.array(imagem_cinza)
+        
+        # Calcular o histograma usando numpy
+        # bins=256 para representar todos os níveis de cinza (0-255)
+        # range=[0,256] define o intervalo de valores considerados
+        histograma, bins = np.histogram(img_array.flatten(), bins=256, range=[0,256])
     
     # Configurar e plotar o histograma
     plt.figure(figsize=(10,6))
@@ -80,19 +89,11 @@ def calcular_histograma(imagem_array):
     Retorna:
     list: Lista com 256 elementos representando a frequência de cada intensidade
     """
-    # Inicializar array de frequências para 256 níveis de cinza (0-255)
-    histograma = [0] * 256
-    
-    # Obter dimensões da imagem
-    altura, largura = imagem_array.shape
+    # Contar a frequência de cada intensidade de uma vez: bincount faz a mesma
+    # contagem do laço pixel a pixel, em C
+    histograma = np.bincount(np.asarray(imagem_array).ravel(), minlength=256)
     
-    # Contar frequência de cada intensidade pixel por pixel
-    for i in range(altura):
-        for j in range(largura):
-            intensidade = imagem_array[i, j]
-            histograma[intensidade] += 1
-    
-    return histograma
+    return histograma.tolist()
 
 def calcular_pdf(histograma, total_pixels):
     """
@@ -106,12 +107,10 @@ def calcular_pdf(histograma, total_pixels):
     Retorna:
     list: PDF normalizada (probabilidades somam 1)
     """
-    pdf = []
-    for freq in histograma:
-        probabilidade = freq / total_pixels
-        pdf.append(probabilidade)
+    # A divisão elemento a elemento em float64 é a mesma de freq / total_pixels
+    pdf = np.asarray(histograma, dtype=np.float64) / total_pixels
     
-    return pdf
+    return pdf.tolist()
 
 def calcular_cdf(pdf):
     """
@@ -124,14 +123,25 @@ def calcular_cdf(pdf):
     Retorna:
     list: CDF - soma acumulada das probabilidades
     """
-    cdf = [0.0] * 256
-    cdf[0] = pdf[0]
+    # np.cumsum acumula em sequência (cdf[i] = cdf[i-1] + pdf[i]), na mesma
+    # ordem do laço, então os valores em float64 são exatamente os mesmos
+    cdf = np.cumsum(np.asarray(pdf, dtype=np.float64))
+    
+    return cdf.tolist()
+
+def tabela_equalizacao(cdf):
+    """
+    Monta a tabela de consulta da equalização a partir da CDF.
+    tabela[i] = round(CDF[i] * 255)
     
-    # Calcular soma acumulada das probabilidades
-    for i in range(1, 256):
-        cdf[i] = cdf[i-1] + pdf[i]
+    Parâmetros:
+    cdf (list): Função de distribuição acumulada
     
-    return cdf
+    Retorna:
+    numpy.ndarray: Tabela uint8 com 256 entradas
+    """
+    # np.rint arredonda meio para o par, como o round do Python
+    return np.rint(np.asarray(cdf, dtype=np.float64) * 255).astype(np.uint8)
 
 def aplicar_transformacao(imagem_array, cdf):
     """
@@ -145,22 +155,16 @@ def aplicar_transformacao(imagem_array, cdf):
     Retorna:
     numpy.ndarray: Imagem com histograma equalizado
     """
-    altura, largura = imagem_array.shape
-    imagem_equalizada = np.zeros_like(imagem_array)
-    
-    # Aplicar transformação pixel por pixel
-    for i in range(altura):
-        for j in range(largura):
-            intensidade_original = imagem_array[i, j]
-            # Mapear usando CDF: nova_intensidade = round(CDF * (L-1))
-            # onde L = 256 (número de níveis de cinza)
-            nova_intensidade = round(cdf[intensidade_original] * 255)
-            imagem_equalizada[i, j] = nova_intensidade
+    # Mapear usando CDF: nova_intensidade = round(CDF * (L-1))
+    # onde L = 256 (número de níveis de cinza). Como o resultado só depende
+    # da intensidade original, monta-se uma tabela de 256 entradas e ela é
+    # aplicada a todos os pixels de uma vez.
+    tabela = tabela_equalizacao(cdf).astype(imagem_array.dtype)
     
-    return imagem_equalizada
+    return _aplicar_tabela(imagem_array, tabela)
 
 # 14
-def equalizar_histograma(imagem_pil):
+def equalizar_histograma(imagem_pil, threads=1, histograma=None, modo='cinza', progresso=None):
     """
     Implementação completa de equalização de histograma seguindo os 3 passos:
     1. Calcular histograma da imagem
@@ -169,24 +173,65 @@ def equalizar_histograma(imagem_pil):
     
     Parâmetros:
     imagem_pil (PIL.Image): Imagem PIL original
+    threads (int): Número de threads. Com mais de 1, o histograma é calculado
+        por faixas horizontais em paralelo (e somado) e a transformação é
+        aplicada por faixas num único array de saída. Padrão: 1
+    histograma (HistogramaAcumulado ou list, opcional): Histograma em escala
+        de cinza de um conjunto de imagens. Se informado, a CDF vem dele e não
+        da própria imagem, de modo que todas as imagens do conjunto recebem a
+        mesma transformação. Padrão: None
+    modo (str): 'cinza' converte a imagem para escala de cinza; 'luminancia'
+        converte imagens coloridas para YCbCr, equaliza só a luminância (Y) e
+        volta para RGB, preservando as cores; nesse modo as conversões e a
+        tabela são aplicadas pela PIL e `threads` não é usado. Padrão: 'cinza'
+    progresso (função, opcional): Recebe a fração concluída (de 0 a 1) a
+        cada faixa de linhas transformada (no modo 'luminancia', só no
+        início e no fim); se retornar False, a equalização é interrompida
+        com `OperacaoCancelada`. Padrão: None
     
     Retorna:
     PIL.Image: Imagem com histograma equalizado
     """
-    # Converter para escala de cinza se necessário
-    if imagem_pil.mode != 'L':
-        imagem_cinza = imagem_pil.convert('L')
-    else:
-        imagem_cinza = imagem_pil
+    if modo not in ('cinza', 'luminancia'):
+        raise ValueError(f"Modo de equalização inválido: {modo}. Use 'cinza' ou 'luminancia'.")
+    _notificar(progresso, 0.0)
     
-    # Converter PIL para array numpy
-    imagem_array = np.array(imagem_cinza)
-    altura, largura = imagem_array.shape
+    colorida = modo == 'luminancia' and imagem_pil.mode not in ('L', 'I', 'F', '1')
+    if colorida:
+        # Converter para YCbCr (em C, de uma vez); só o canal Y é equalizado
+        imagem_ycbcr = imagem_pil.convert('YCbCr')
+        altura, largura = imagem_ycbcr.height, imagem_ycbcr.width
+    else:
+        # Converter para escala de cinza se necessário
+        if imagem_pil.mode != 'L':
+            imagem_cinza = imagem_pil.convert('L')
+        else:
+            imagem_cinza = imagem_pil
+        
+        # Converter PIL para array numpy
+        imagem_array = np.array(imagem_cinza)
+        altura, largura = imagem_array.shape
     total_pixels = altura * largura
     
     # PASSO 1: Calcular histograma da imagem
     # print("Passo 1: Calculando histograma...")
-    histograma = calcular_histograma(imagem_array)
+    if histograma is not None:
+        # Histograma global (de um conjunto de imagens) no lugar do da imagem
+        if isinstance(histograma, HistogramaAcumulado):
+            if histograma.canais != 1:
+                raise ValueError("A equalização usa um histograma acumulado em escala de cinza (canais=1).")
+            histograma = histograma.histograma()
+        total_pixels = sum(histograma)
+    elif colorida:
+        # Contagens do canal Y, pelo histograma da PIL
+        histograma = imagem_ycbcr.getchannel('Y').histogram()
+    elif threads > 1:
+        with ThreadPoolExecutor(threads) as executor:
+            parciais = executor.map(lambda faixa: calcular_histograma(imagem_array[faixa[0]:faixa[1]]),
+                                    _faixas(altura, threads))
+            histograma = [sum(contagens) for contagens in zip(*parciais)]
+    else:
+        histograma = calcular_histograma(imagem_array)
     
     # Calcular PDF (Função de Densidade de Probabilidade)
     # print("Calculando PDF...")
@@ -198,9 +243,443 @@ def equalizar_histograma(imagem_pil):
     
     # PASSO 3: Aplicar função de transformação
     # print("Passo 3: Aplicando transformação...")
-    imagem_equalizada = aplicar_transformacao(imagem_array, cdf)
+    if colorida:
+        imagem_rgb = _aplicar_na_luminancia(imagem_pil, imagem_ycbcr, tabela_equalizacao(cdf))
+        _notificar(progresso, 1.0)
+        return imagem_rgb
+    
+    imagem_equalizada = _executar_em_faixas(lambda faixa: aplicar_transformacao(faixa, cdf),
+                                            imagem_array, 0, threads, imagem_array.dtype, progresso)
     
     # Converter de volta para PIL Image
     imagem_equalizada_pil = Image.fromarray(imagem_equalizada.astype(np.uint8), mode='L')
     
-    return imagem_equalizada_pil
\ No newline at end of file
+    return imagem_equalizada_pil
+
+def _aplicar_na_luminancia(imagem_pil, imagem_ycbcr, tabela):
+    """
+    Aplica uma tabela ao canal Y de uma imagem YCbCr e volta para RGB.
+    """
+    # Tabela no canal Y e identidade em Cb e Cr, aplicadas numa única
+    # passada; depois volta para RGB (mantendo o alfa)
+    identidade = list(range(256))
+    imagem_rgb = imagem_ycbcr.point(tabela.tolist() + identidade + identidade).convert('RGB')
+    if 'A' in imagem_pil.getbands():
+        imagem_rgb.putalpha(imagem_pil.getchannel('A'))
+    return imagem_rgb
+
+#
+    # Equalização adaptativa com limite de contraste (CLAHE)
+#
+
+def _tabelas_blocos(imagem_array, altura_bloco, largura_bloco, limite_corte):
+    """
+    Tabelas de equalização (uma por bloco) dos histogramas recortados.
+
+    Retorna:
+    numpy.ndarray: Tabelas uint8 no formato (blocos_y, blocos_x, 256)
+    """
+    altura, largura = imagem_array.shape
+    blocos_y, blocos_x = -(-altura // altura_bloco), -(-largura // largura_bloco)
+
+    # Histogramas de uma linha de blocos com um único bincount: cada coluna
+    # soma 256 * (índice do bloco) à intensidade
+    deslocamento = (np.arange(largura) // largura_bloco * 256).astype(np.int32)
+    histogramas = np.empty((blocos_y, blocos_x, 256), dtype=np.int64)
+    for i in range(blocos_y):
+        faixa = imagem_array[i * altura_bloco:(i + 1) * altura_bloco]
+        histogramas[i] = np.bincount((faixa + deslocamento).ravel(),
+                                     minlength=blocos_x * 256).reshape(blocos_x, 256)
+
+    area = histogramas.sum(axis=2, keepdims=True)
+    if limite_corte:
+        # Recorta cada histograma e redistribui o excesso igualmente entre os
+        # níveis; o resto da divisão vai para níveis espaçados regularmente
+        limite = np.maximum((limite_corte * area) // 256, 1).astype(np.int64)
+        excesso = np.maximum(histogramas - limite, 0).sum(axis=2, keepdims=True)
+        histogramas = np.minimum(histogramas, limite) + excesso // 256
+        resto = excesso % 256
+        passo = np.maximum(256 // np.maximum(resto, 1), 1)
+        histogramas += (_NIVEIS % passo == 0) & (_NIVEIS // passo < resto)
+
+    # Mesmos passos da equalização global: CDF e tabela round(CDF * 255)
+    cdf = np.cumsum(histogramas, axis=2) / area
+    return tabela_equalizacao(cdf)
+
+def _eixo_interpolacao(tamanho, tamanho_bloco, blocos):
+    """
+    Para cada linha (ou coluna): blocos vizinhos e peso do segundo na interpolação.
+    """
+    # Posição em unidades de bloco, com 0 no centro do primeiro bloco
+    posicao = (np.arange(tamanho) - (tamanho_bloco - 1) / 2) / tamanho_bloco
+    anterior = np.floor(posicao).astype(np.intp)
+    peso = (posicao - anterior).astype(np.float32)
+    # Fora dos centros extremos, os dois vizinhos são o mesmo bloco
+    return np.clip(anterior, 0, blocos - 1), np.clip(anterior + 1, 0, blocos - 1), peso
+
+def equalizar_histograma_adaptativa(imagem_pil, blocos=(8, 8), limite_corte=2.0, progresso=None):
+    """
+    Equalização de histograma adaptativa com limite de contraste (CLAHE).
+
+    A imagem é dividida numa grade de blocos e cada bloco é equalizado com o
+    seu próprio histograma, recortado em `limite_corte` vezes a altura média
+    (o excesso é redistribuído), o que limita a amplificação de ruído em
+    regiões uniformes. Cada pixel recebe a interpolação bilinear das tabelas
+    dos quatro blocos mais próximos, calculada com operações sobre arrays
+    inteiros: as tabelas são interpoladas na horizontal para cada coluna e,
+    para cada faixa de linhas entre centros de blocos, os valores das duas
+    tabelas vizinhas são lidos por indexação e misturados na vertical.
+    
+    Parâmetros:
+    imagem_pil (PIL.Image): Imagem PIL original
+    blocos (tuple): Número de blocos (linhas, colunas) da grade. Padrão: (8, 8)
+    limite_corte (float): Limite de contraste, em múltiplos da altura média do
+        histograma de um bloco. 0 ou None desativa o recorte. Padrão: 2.0
+    progresso (função, opcional): Recebe a fração concluída (de 0 a 1) a
+        cada faixa de linhas entre centros de blocos; se retornar False, a
+        equalização é interrompida com `OperacaoCancelada`. Padrão: None
+    
+    Retorna:
+    PIL.Image: Imagem equalizada em escala de cinza
+    """
+    _notificar(progresso, 0.0)
+    # Converter para escala de cinza se necessário
+    imagem_cinza = imagem_pil if imagem_pil.mode == 'L' else imagem_pil.convert('L')
+    imagem_array = np.asarray(imagem_cinza)
+    altura, largura = imagem_array.shape
+
+    altura_bloco = -(-altura // min(blocos[0], altura))
+    largura_bloco = -(-largura // min(blocos[1], largura))
+    tabelas = _tabelas_blocos(imagem_array, altura_bloco, largura_bloco, limite_corte)
+    blocos_y, blocos_x = tabelas.shape[:2]
+
+    linha_a, linha_b, peso_y = _eixo_interpolacao(altura, altura_bloco, blocos_y)
+    coluna_a, coluna_b, peso_x = _eixo_interpolacao(largura, largura_bloco, blocos_x)
+
+    def tabela_horizontal(i):
+        # Tabela de cada coluna, interpolada entre os blocos da linha i: (largura, 256)
+        tabela = tabelas[i].astype(np.float32)
+        return tabela[coluna_a] * (1 - peso_x)[:, None] + tabela[coluna_b] * peso_x[:, None]
+
+    # Índice na tabela horizontal achatada: 256 * coluna + intensidade
+    base = np.arange(largura, dtype=np.int32) * 256
+    saida = np.empty_like(imagem_array)
+    inicios = np.flatnonzero(np.r_[True, (linha_a[1:] != linha_a[:-1]) | (linha_b[1:] != linha_b[:-1])])
+    fins = np.r_[inicios[1:], altura]
+    tabelas_horizontais = {}
+    for y0, y1 in zip(inicios, fins):
+        a, b = linha_a[y0], linha_b[y0]
+        # Faixas consecutivas compartilham uma linha de blocos: guarda só as atuais
+        tabelas_horizontais = {i: tabelas_horizontais[i] if i in tabelas_horizontais
+                               else tabela_horizontal(i) for i in (a, b)}
+        indices = imagem_array[y0:y1] + base
+        superior = np.take(tabelas_horizontais[a], indices)
+        inferior = np.take(tabelas_horizontais[b], indices)
+        superior += peso_y[y0:y1, None] * (inferior - superior)
+        saida[y0:y1] = np.rint(superior)
+        _notificar(progresso, y1 / altura)
+
+    return Image.fromarray(saida, mode='L')
+
+
+#
+    # Especificação (casamento) de histograma
+#
+
+def perfil_referencia(referencia):
+    """
+    Calcula o perfil (CDF) de referência usado por `especificar_histograma`.
+
+    Calcule o perfil uma vez e reutilize-o em todas as imagens: só a CDF da
+    imagem de entrada precisa ser calculada a cada chamada.
+    
+    Parâmetros:
+    referencia (PIL.Image, HistogramaAcumulado ou list): Imagem de referência
+        (em escala de cinza), histograma acumulado de um conjunto de imagens,
+        ou distribuição desejada como 256 pesos (não precisam somar 1)
+    
+    Retorna:
+    numpy.ndarray: CDF de referência com 256 valores em float64
+    """
+    if isinstance(referencia, Image.Image):
+        imagem_cinza = referencia if referencia.mode == 'L' else referencia.convert('L')
+        referencia = calcular_histograma(np.asarray(imagem_cinza))
+    elif isinstance(referencia, HistogramaAcumulado):
+        if referencia.canais != 1:
+            raise ValueError("A especificação usa um histograma acumulado em escala de cinza (canais=1).")
+        referencia = referencia.histograma()
+
+    if len(referencia) != 256:
+        raise ValueError("A distribuição de referência precisa ter 256 valores.")
+    return np.asarray(calcular_cdf(calcular_pdf(referencia, sum(referencia))), dtype=np.float64)
+
+def tabela_especificacao(cdf, cdf_referencia):
+    """
+    Monta a tabela que leva a CDF da imagem à CDF de referência.
+    tabela[i] = menor nível z tal que CDF_referencia[z] >= CDF[i]
+    
+    Parâmetros:
+    cdf (list): CDF da imagem de entrada
+    cdf_referencia (numpy.ndarray): CDF de referência (ver `perfil_referencia`)
+    
+    Retorna:
+    numpy.ndarray: Tabela uint8 com 256 entradas
+    """
+    # Inversão da CDF de referência para os 256 níveis de uma vez (busca
+    # binária); o mínimo evita o índice 256 quando a soma fica abaixo de 1.0
+    # por arredondamento
+    niveis = np.searchsorted(cdf_referencia, np.asarray(cdf, dtype=np.float64), side='left')
+    return np.minimum(niveis, 255).astype(np.uint8)
+
+def especificar_histograma(imagem_pil, referencia, modo='cinza', progresso=None):
+    """
+    Especificação de histograma: transforma a imagem para que o seu
+    histograma se aproxime do histograma de referência.
+    1. Calcular histograma, PDF e CDF da imagem
+    2. Inverter a CDF de referência numa tabela de 256 entradas
+    3. Aplicar a tabela numa única passada
+    
+    Parâmetros:
+    imagem_pil (PIL.Image): Imagem PIL original
+    referencia (numpy.ndarray, PIL.Image, HistogramaAcumulado ou list): Perfil
+        calculado por `perfil_referencia` (recomendado ao processar várias
+        imagens) ou qualquer referência aceita por `perfil_referencia`
+    modo (str): 'cinza' ou 'luminancia', como em `equalizar_histograma`.
+        Padrão: 'cinza'
+    progresso (função, opcional): Recebe a fração concluída, 0 no início e
+        1 no fim (a tabela é aplicada numa única passada); se retornar
+        False, a especificação é interrompida com `OperacaoCancelada`.
+        Padrão: None
+    
+    Retorna:
+    PIL.Image: Imagem com histograma especificado
+    """
+    if modo not in ('cinza', 'luminancia'):
+        raise ValueError(f"Modo de especificação inválido: {modo}. Use 'cinza' ou 'luminancia'.")
+    _notificar(progresso, 0.0)
+    if not isinstance(referencia, np.ndarray):
+        referencia = perfil_referencia(referencia)
+
+    if modo == 'luminancia' and imagem_pil.mode not in ('L', 'I', 'F', '1'):
+        imagem_ycbcr = imagem_pil.convert('YCbCr')
+        histograma = imagem_ycbcr.getchannel('Y').histogram()
+        cdf = calcular_cdf(calcular_pdf(histograma, imagem_ycbcr.width * imagem_ycbcr.height))
+        imagem_especificada = _aplicar_na_luminancia(imagem_pil, imagem_ycbcr,
+                                                     tabela_especificacao(cdf, referencia))
+    else:
+        imagem_cinza = imagem_pil if imagem_pil.mode == 'L' else imagem_pil.convert('L')
+        imagem_array = np.asarray(imagem_cinza)
+        cdf = calcular_cdf(calcular_pdf(calcular_histograma(imagem_array), imagem_array.size))
+        imagem_especificada = _aplicar_tabela(imagem_cinza, tabela_especificacao(cdf, referencia))
+
+    _notificar(progresso, 1.0)
+    return imagem_especificada
+
+
+#
+    # Histogramas acumulados (imagens grandes e conjuntos de imagens)
+#
+
+class HistogramaAcumulado:
+    """
+    Histograma de intensidades acumulado de forma incremental.
+
+    Recebe imagens inteiras ou blocos (tiles) com `adicionar`, um de cada
+    vez, então o conjunto pode ser muito maior que a memória. Acumuladores
+    calculados em processos diferentes são somados com `mesclar` (ou `+`).
+    Com `canais=1` as contagens são da imagem em escala de cinza (como em
+    `equalizar_histograma`); com `canais=3`, de cada canal RGB.
+
+    Exemplo:
+    --------
+    >>> acumulado = HistogramaAcumulado()
+    >>> for caminho in caminhos:
+    ...     acumulado.adicionar(Image.open(caminho))
+    >>> equalizada = equalizar_histograma(imagem, histograma=acumulado)
+    """
+
+    def __init__(self, canais=1):
+        """
+        Parâmetros:
+        -----------
+        canais : int, opcional
+            1 (escala de cinza) ou 3 (R, G e B separados). Default = 1
+        """
+        if canais not in (1, 3):
+            raise ValueError("O histograma acumulado suporta 1 (cinza) ou 3 (RGB) canais.")
+        self.canais = canais
+        self.contagens = np.zeros((canais, 256), dtype=np.int64)
+
+    def adicionar(self, imagem, linhas_por_bloco=1024, progresso=None):
+        """
+        Soma as contagens de uma imagem ou de um bloco de imagem.
+
+        Parâmetros:
+        -----------
+        imagem : PIL.Image ou numpy.ndarray
+            Imagem, bloco ou array mapeado em memória (np.memmap) de 8 bits,
+            no formato (altura, largura) ou (altura, largura, canais).
+        linhas_por_bloco : int, opcional
+            Arrays são lidos em faixas com este número de linhas, para que
+            um memmap grande não seja carregado inteiro. Default = 1024
+        progresso : função, opcional
+            Recebe a fração concluída (de 0 a 1) a cada faixa lida; se
+            retornar False, a contagem é interrompida com `OperacaoCancelada`
+            (as faixas já lidas continuam somadas). Default = None
+
+        Retorna:
+        --------
+        HistogramaAcumulado
+            O próprio acumulador.
+        """
+        if isinstance(imagem, Image.Image):
+            modo = 'L' if self.canais == 1 else 'RGB'
+            imagem = np.asarray(imagem if imagem.mode == modo else imagem.convert(modo))
+
+        if imagem.dtype != np.uint8:
+            raise ValueError("O histograma acumulado suporta apenas imagens de 8 bits.")
+        if imagem.ndim == 2 and self.canais == 3:
+            raise ValueError("Imagem em escala de cinza num histograma RGB (canais=3).")
+
+        altura = imagem.shape[0]
+        _notificar(progresso, 0.0)
+        for y in range(0, altura, linhas_por_bloco):
+            faixa = np.asarray(imagem[y:y + linhas_por_bloco])
+            if faixa.ndim == 3 and self.canais == 1:
+                # Mesma conversão para cinza da PIL usada em equalizar_histograma
+                faixa = np.asarray(Image.fromarray(np.ascontiguousarray(faixa[..., :3])).convert('L'))
+            if self.canais == 1:
+                self.contagens[0] += np.bincount(faixa.ravel(), minlength=256)
+            else:
+                for canal in range(3):
+                    self.contagens[canal] += np.bincount(faixa[..., canal].ravel(), minlength=256)
+            _notificar(progresso, min(y + linhas_por_bloco, altura) / altura)
+        return self
+
+    def mesclar(self, outro):
+        """
+        Soma as contagens de outro acumulador (por exemplo, de outro processo).
+
+        Retorna:
+        --------
+        HistogramaAcumulado
+            O próprio acumulador.
+        """
+        if outro.canais != self.canais:
+            raise ValueError("Os histogramas acumulados precisam ter o mesmo número de canais.")
+        self.contagens += outro.contagens
+        return self
+
+    def __iadd__(self, outro):
+        return self.mesclar(outro)
+
+    def __add__(self, outro):
+        soma = HistogramaAcumulado(self.canais)
+        return soma.mesclar(self).mesclar(outro)
+
+    @property
+    def total_pixels(self):
+        """Número de pixels acumulados (por canal)."""
+        return int(self.contagens[0].sum())
+
+    def histograma(self, canal=0):
+        """
+        Contagens de um canal, como em `calcular_histograma` (lista de 256 inteiros).
+        """
+        return self.contagens[canal].tolist()
+
+    def cdf(self, canal=0):
+        """
+        CDF de um canal, calculada com `calcular_pdf` e `calcular_cdf`.
+        """
+        return calcular_cdf(calcular_pdf(self.histograma(canal), self.total_pixels))
+
+def _acumular(itens, canais, progresso=None):
+    """
+    Acumula o histograma de uma lista de caminhos ou imagens (usado pelos processos).
+
+    Retorna o acumulador e a lista de (caminho, erro) dos arquivos que não
+    puderam ser lidos; esses arquivos ficam fora do histograma.
+    """
+    acumulado = HistogramaAcumulado(canais)
+    erros = []
+    _notificar(progresso, 0.0)
+    for indice, item in enumerate(itens):
+        if isinstance(item, str):
+            # Um arquivo ilegível ou corrompido não interrompe o conjunto
+            parcial = HistogramaAcumulado(canais)
+            try:
+                with Image.open(item) as imagem:
+                    parcial.adicionar(imagem)
+            except Exception as erro:
+                erros.append((item, erro))
+            else:
+                acumulado.mesclar(parcial)
+        else:
+            acumulado.adicionar(item)
+        _notificar(progresso, (indice + 1) / len(itens))
+    return acumulado, erros
+
+def _acumular_parte(parte):
+    return _acumular(*parte)
+
+def acumular_histogramas(imagens, canais=1, processos=1, progresso=None, erros=None):
+    """
+    Calcula o histograma de um conjunto de imagens numa única passada.
+
+    Com mais de um processo, as imagens são divididas entre eles, cada
+    processo acumula o seu próprio histograma e os resultados são mesclados.
+
+    Parâmetros:
+    -----------
+    imagens : list
+        Caminhos de arquivos, PIL.Images ou arrays de 8 bits.
+    canais : int, opcional
+        1 (escala de cinza) ou 3 (RGB). Default = 1
+    processos : int, opcional
+        Número de processos. Default = 1
+    progresso : função, opcional
+        Recebe a fração concluída (de 0 a 1) a cada imagem (com vários
+        processos, a cada parte do conjunto); se retornar False, a
+        contagem é interrompida com `OperacaoCancelada`. Default = None
+    erros : list, opcional
+        Se informada, recebe (caminho, erro) de cada arquivo que não pôde
+        ser lido, e o histograma é calculado com os demais. Default = None
+        (o primeiro arquivo ilegível levanta a exceção)
+
+    Retorna:
+    --------
+    HistogramaAcumulado
+        Histograma de todo o conjunto.
+    """
+    imagens = list(imagens)
+    if processos <= 1 or len(imagens) <= 1:
+        acumulado, falhas = _acumular(imagens, canais, progresso)
+        return _registrar_falhas(acumulado, falhas, erros)
+
+    processos = min(processos, len(imagens))
+    partes = [(imagens[i::processos], canais) for i in range(processos)]
+    acumulado = HistogramaAcumulado(canais)
+    falhas = []
+    _notificar(progresso, 0.0)
+    with multiprocessing.Pool(processos) as pool:
+        # As partes são mescladas conforme terminam; ao sair do bloco com
+        # `OperacaoCancelada`, o pool é encerrado
+        for concluidas, (parcial, falhas_parte) in enumerate(pool.imap_unordered(_acumular_parte, partes), 1):
+            acumulado.mesclar(parcial)
+            falhas.extend(falhas_parte)
+            _notificar(progresso, concluidas / len(partes))
+    # Na ordem da entrada, não na de conclusão dos processos
+    posicao = {item: indice for indice, item in enumerate(imagens) if isinstance(item, str)}
+    falhas.sort(key=lambda falha: posicao[falha[0]])
+    return _registrar_falhas(acumulado, falhas, erros)
+
+def _registrar_falhas(acumulado, falhas, erros):
+    """
+    Entrega as falhas de leitura em `erros` ou, sem a lista, levanta a primeira.
+    """
+    if falhas:
+        if erros is None:
+            raise falhas[0][1]
+        erros.extend(falhas)
+    return acumulado
@@ -1,57 +1,34 @@
 import FreeSimpleGUI as sg
 import io
+import math
 import os
+import time
+import weakref
+from functools import partial
 
 from Filtros import *
 from Histograma import *
+from Catalogo import filtros_disponiveis, filtros_parametros
+from Tarefas import ExecutorTarefas
 
 #Layout
 sg.theme('TanBlue')
 
-# Lista de filtros disponíveis
-filtros_disponiveis = [
-    "Limiriazação",
-    "Escala de Cinza", 
-    "Passa-Alta Básico",
-    "Passa-Alta Alto Reforço",
-    "Passa-Baixa Média",
-    "Passa-Baixa Mediana",
-    "Roberts",
-    "Prewitt",
-    "Sobel",
-    "Transformação Logarítmica",
-    "Operações Aritméticas",
-    "Ruídos",
-    "Histograma",
-    "Equalização de Histograma"
-]
-
-# Define quais parâmetros cada filtro precisa
-filtros_parametros = {
-    "Limiriazação": ["limiar"],
-    "Passa-Alta Básico": ["kernel_pa_basico"],
-    "Passa-Alta Alto Reforço": ["kernel_pa_basico", "fator_k"],
-    "Passa-Baixa Média": ["kernel"],
-    "Passa-Baixa Mediana": ["kernel"],
-    "Sobel": ["direcao", "pos_processamento"],
-    "Transformação Logarítmica": [],
-    "Ruídos": ["taxa_ruido"],
-    "Operações Aritméticas": ["operacao", "segunda_imagem", "escalar"]
-}
-
 # Layout dos parâmetros dinâmicos
 layout_parametros = [
     [sg.Text("Limiar (0-255):", font=("Helvetica", 10), visible=False, key="-TEXT_LIMIAR-"),
-     sg.InputText("150", size=(5,1), key="-VALOR_LIMIAR-", visible=False)],
+     sg.InputText("150", size=(5,1), key="-VALOR_LIMIAR-", visible=False, enable_events=True)],
 
     [sg.Text("Tamanho do Kernel (ímpar ≥3):", font=("Helvetica", 10), visible=False, key="-TEXT_KERNEL-"),
-     sg.InputText("3", size=(5,1), key="-VALOR_KERNEL-", visible=False)],
+     sg.InputText("3", size=(5,1), key="-VALOR_KERNEL-", visible=False, enable_events=True)],
+
+    [sg.Checkbox("Apenas ruído impulsivo (0/255)", key="-MEDIANA_IMPULSOS-", visible=False, enable_events=True)],
 
     [sg.Text("Operação:", visible=False, key="-TEXT_OPERACAO-"),
-     sg.Combo(["soma", "subtracao", "multiplicacao"], key="-OPERACAO_ARITMETICA-", visible=False)],
+     sg.Combo(["soma", "subtracao", "multiplicacao"], key="-OPERACAO_ARITMETICA-", visible=False, enable_events=True)],
 
     [sg.Text("Valor Escalar:", visible=False, key="-TEXT_ESCALAR-"),
-     sg.InputText("1.0", size=(5,1), key="-VALOR_ESCALAR-", visible=False)],
+     sg.InputText("1.0", size=(5,1), key="-VALOR_ESCALAR-", visible=False, enable_events=True)],
 
     [sg.Text("Segunda Imagem:", visible=False, key="-TEXT_SEGUNDA_IMAGEM-")],
     [sg.InputText(key="-SEGUNDA_IMAGEM-", size=(25,1), visible=False, enable_events=False),
@@ -62,25 +39,67 @@ layout_parametros = [
     [sg.Image(key="segunda_imagem", visible=False)],
 
     [sg.Text("Tipo de Kernel:", font=("Helvetica", 10), visible=False, key="-TEXT_KERNEL_PA-")],
-    [sg.Radio("Laplaciano 4-vizinhos", "KERNEL_PA", default=True, key="-KERNEL_PA_4-", visible=False)],
-    [sg.Radio("Laplaciano 8-vizinhos", "KERNEL_PA", key="-KERNEL_PA_8-", visible=False)],
+    [sg.Radio("Laplaciano 4-vizinhos", "KERNEL_PA", default=True, key="-KERNEL_PA_4-", visible=False, enable_events=True)],
+    [sg.Radio("Laplaciano 8-vizinhos", "KERNEL_PA", key="-KERNEL_PA_8-", visible=False, enable_events=True)],
 
     [sg.Text("Fator de Reforço (k):", font=("Helvetica", 10), visible=False, key="-TEXT_FATOR_K-"),
-     sg.InputText("1.0", size=(5, 1), key="-VALOR_FATOR_K-", visible=False)],
+     sg.InputText("1.0", size=(5, 1), key="-VALOR_FATOR_K-", visible=False, enable_events=True)],
+    [sg.Checkbox("Recortar o Laplaciano (só bordas positivas)", key="-REFORCO_RECORTADO-", visible=False, enable_events=True)],
 
     [sg.Text("Direção do Gradiente:", font=("Helvetica", 10), visible=False, key="-TEXT_DIRECAO-")],
-    [sg.Radio("Ambos (Magnitude)", "DIRECAO", default=True, key="-DIR_AMBOS-", visible=False)],
-    [sg.Radio("Horizontal (Gx)", "DIRECAO", key="-DIR_GX-", visible=False)],
-    [sg.Radio("Vertical (Gy)", "DIRECAO", key="-DIR_GY-", visible=False)],
+    [sg.Radio("Ambos (Magnitude)", "DIRECAO", default=True, key="-DIR_AMBOS-", visible=False, enable_events=True)],
+    [sg.Radio("Horizontal (Gx)", "DIRECAO", key="-DIR_GX-", visible=False, enable_events=True)],
+    [sg.Radio("Vertical (Gy)", "DIRECAO", key="-DIR_GY-", visible=False, enable_events=True)],
 
     [sg.Text("Pós-processamento:", font=("Helvetica", 10), visible=False, key="-TEXT_POS-", pad=((0,0), (10,0)))],
-    [sg.Radio("Clipping", "POS", default=True, key="-POS_CLIP-", visible=False)],
-    [sg.Radio("Normalização", "POS", key="-POS_NORM-", visible=False)],
+    [sg.Radio("Clipping", "POS", default=True, key="-POS_CLIP-", visible=False, enable_events=True)],
+    [sg.Radio("Normalização", "POS", key="-POS_NORM-", visible=False, enable_events=True)],
 
     [sg.Text("Taxa de Ruído (0.0 a 1.0):", font=("Helvetica", 10), visible=False, key="-TEXT_TAXA_RUIDO-")],
-    [sg.InputText("0.05", size=(5, 1), key="-VALOR_TAXA_RUIDO-", visible=False)],
+    [sg.InputText("0.05", size=(5, 1), key="-VALOR_TAXA_RUIDO-", visible=False, enable_events=True)],
+
+    [sg.Checkbox("Preservar cores (equalizar a luminância)", key="-EQUALIZACAO_LUMINANCIA-", visible=False, enable_events=True)],
+
+    [sg.Text("Limite de Contraste:", font=("Helvetica", 10), visible=False, key="-TEXT_LIMITE_CORTE-"),
+     sg.InputText("2.0", size=(5, 1), key="-VALOR_LIMITE_CORTE-", visible=False, enable_events=True)],
 ]
 
+# Eventos dos parâmetros: editar um parâmetro cancela a conversão em andamento
+EVENTOS_PARAMETROS = [
+    "-VALOR_LIMIAR-",
+    "-VALOR_KERNEL-",
+    "-MEDIANA_IMPULSOS-",
+    "-OPERACAO_ARITMETICA-",
+    "-VALOR_ESCALAR-",
+    "-KERNEL_PA_4-",
+    "-KERNEL_PA_8-",
+    "-VALOR_FATOR_K-",
+    "-REFORCO_RECORTADO-",
+    "-DIR_AMBOS-",
+    "-DIR_GX-",
+    "-DIR_GY-",
+    "-POS_CLIP-",
+    "-POS_NORM-",
+    "-VALOR_TAXA_RUIDO-",
+    "-EQUALIZACAO_LUMINANCIA-",
+    "-VALOR_LIMITE_CORTE-",
+]
+
+# Outros eventos que mudam o resultado e disparam a prévia ao vivo
+EVENTOS_PREVIA = ["-LISTA_FILTROS-", "-PREVIA_AO_VIVO-", "Carregar Imagem", "-CARREGAR_SEGUNDA-"]
+
+# Tamanho máximo das imagens exibidas (as imagens carregadas e os
+# resultados continuam na resolução original)
+TAMANHO_EXIBICAO = (400, 400)
+
+# Prévia ao vivo: espera após a última edição e tempo total (espera +
+# cálculo) até a prévia aparecer, em segundos
+ATRASO_PREVIA = 0.03
+ORCAMENTO_PREVIA = 0.1
+
+# Filtros sem prévia ao vivo (o histograma abre uma janela própria)
+FILTROS_SEM_PREVIA = ["Histograma"]
+
 # Layout dos parâmetros dinâmicos dentro de uma coluna
 parametros_coluna = sg.Column(
     layout_parametros,
@@ -107,7 +126,10 @@ coluna_imagens = sg.Column(
                 [sg.Image(key="resultado_imagem")],
             ], element_justification='center', vertical_alignment='top', pad=(10, 10)),
         ],
-        [sg.Button("CONVERTER", key="converter")],
+        [sg.Button("CONVERTER", key="converter"),
+         sg.Button("Cancelar", key="-CANCELAR-", visible=False),
+         sg.Checkbox("Prévia ao vivo", default=True, key="-PREVIA_AO_VIVO-", enable_events=True),
+         sg.Text("", key="-STATUS-", size=(30, 1))],
 
         # Segunda linha: seleção de imagem
         [
@@ -160,15 +182,16 @@ layout = [
 def atualizar_parametros_visiveis(filtro):
     # Oculta todos
     for key in ["-TEXT_LIMIAR-", "-VALOR_LIMIAR-",
-                "-TEXT_KERNEL-", "-VALOR_KERNEL-",
+                "-TEXT_KERNEL-", "-VALOR_KERNEL-", "-MEDIANA_IMPULSOS-",
                 "-TEXT_OPERACAO-", "-OPERACAO_ARITMETICA-",
                 "-TEXT_SEGUNDA_IMAGEM-", "-SEGUNDA_IMAGEM-", "-BROWSE_SEGUNDA_IMAGEM-",
                 "-TEXT_ESCALAR-", "-VALOR_ESCALAR-", "-CARREGAR_SEGUNDA-", "segunda_imagem",
                 "-TEXT_KERNEL_PA-", "-KERNEL_PA_4-", "-KERNEL_PA_8-",
-                "-TEXT_FATOR_K-", "-VALOR_FATOR_K-",
+                "-TEXT_FATOR_K-", "-VALOR_FATOR_K-", "-REFORCO_RECORTADO-",
                 "-TEXT_DIRECAO-", "-DIR_AMBOS-", "-DIR_GX-", "-DIR_GY-",
                 "-TEXT_POS-", "-POS_CLIP-", "-POS_NORM-",
-                "-TEXT_TAXA_RUIDO-", "-VALOR_TAXA_RUIDO-"]:
+                "-TEXT_TAXA_RUIDO-", "-VALOR_TAXA_RUIDO-",
+                "-EQUALIZACAO_LUMINANCIA-", "-TEXT_LIMITE_CORTE-", "-VALOR_LIMITE_CORTE-"]:
         window[key].update(visible=False)
 
     parametros = filtros_parametros.get(filtro, [])
@@ -178,6 +201,8 @@ def atualizar_parametros_visiveis(filtro):
     if "kernel" in parametros:
         window["-TEXT_KERNEL-"].update(visible=True)
         window["-VALOR_KERNEL-"].update(visible=True)
+    if "mediana_impulsos" in parametros:
+        window["-MEDIANA_IMPULSOS-"].update(visible=True)
     if "operacao" in parametros:
         window["-TEXT_OPERACAO-"].update(visible=True)
         window["-OPERACAO_ARITMETICA-"].update(visible=True)
@@ -197,6 +222,8 @@ def atualizar_parametros_visiveis(filtro):
     if "fator_k" in parametros:
         window["-TEXT_FATOR_K-"].update(visible=True)
         window["-VALOR_FATOR_K-"].update(visible=True)
+    if "reforco_recortado" in parametros:
+        window["-REFORCO_RECORTADO-"].update(visible=True)
     if "direcao" in parametros:
         for key in ["-TEXT_DIRECAO-", "-DIR_AMBOS-", "-DIR_GX-", "-DIR_GY-"]:
             window[key].update(visible=True)
@@ -206,6 +233,231 @@ def atualizar_parametros_visiveis(filtro):
     if "taxa_ruido" in parametros:
         window["-TEXT_TAXA_RUIDO-"].update(visible=True)
         window["-VALOR_TAXA_RUIDO-"].update(visible=True)
+    if "equalizacao_luminancia" in parametros:
+        window["-EQUALIZACAO_LUMINANCIA-"].update(visible=True)
+    if "limite_corte" in parametros:
+        window["-TEXT_LIMITE_CORTE-"].update(visible=True)
+        window["-VALOR_LIMITE_CORTE-"].update(visible=True)
+
+
+# Miniaturas e miniaturas codificadas já geradas, pela identidade da imagem;
+# cada uma sai do cache quando a sua imagem deixa de existir
+_miniaturas = {}
+_codificadas = {}
+
+def _guardar(cache, imagem, valor):
+    chave = id(imagem)
+    cache[chave] = valor
+    weakref.finalize(imagem, cache.pop, chave, None)
+    return valor
+
+def miniatura(imagem):
+    # Cópia reduzida para exibição, gerada só na primeira vez que a imagem é
+    # exibida (a própria imagem, se já couber na interface)
+    if imagem.width <= TAMANHO_EXIBICAO[0] and imagem.height <= TAMANHO_EXIBICAO[1]:
+        return imagem
+    if id(imagem) in _miniaturas:
+        return _miniaturas[id(imagem)]
+    reduzida = imagem.copy()
+    reduzida.thumbnail(TAMANHO_EXIBICAO)
+    return _guardar(_miniaturas, imagem, reduzida)
+
+def codificar_exibicao(imagem):
+    # Miniatura em PPM/PGM sem compressão, que o Tk lê diretamente: sem o
+    # zlib do PNG, codificar custa uma cópia dos pixels (~0,1 ms em 400x400,
+    # contra ~60 ms do PNG). Codificada uma vez por imagem.
+    if id(imagem) in _codificadas:
+        return _codificadas[id(imagem)]
+    reduzida = miniatura(imagem)
+    if reduzida.mode not in ("L", "RGB"):
+        # PGM (cinza) e PPM (RGB) não têm alfa nem paleta
+        cinza = reduzida.mode in ("1", "I", "F") or reduzida.mode.startswith("I;")
+        reduzida = reduzida.convert("L" if cinza else "RGB")
+    buf = io.BytesIO()
+    reduzida.save(buf, format="PPM")
+    return _guardar(_codificadas, imagem, buf.getvalue())
+
+def exibir(chave, imagem, **kwargs):
+    window[chave].update(data=codificar_exibicao(imagem), **kwargs)
+
+def exibir_resultado(imagem, tamanho=None):
+    # Prévias calculadas numa imagem menor são ampliadas para o tamanho da exibição
+    if tamanho is not None and imagem.size != tamanho:
+        imagem = imagem.resize(tamanho)
+    exibir("resultado_imagem", imagem)
+
+def exibir_segunda_imagem(caminho):
+    # Mostrar a segunda imagem na interface
+    exibir("segunda_imagem", Image.open(caminho), visible=True)
+
+def mostrar_status(texto, ocupado=False):
+    # Indicador de ocupado: texto de status e botão de cancelar
+    window["-STATUS-"].update(texto)
+    window["-CANCELAR-"].update(visible=ocupado)
+
+def reduzir_para_orcamento(proxy, custo):
+    # Reduz a prévia de filtros lentos para que o cálculo caiba no orçamento;
+    # `custo` é o tempo por pixel medido na última prévia do filtro
+    if custo is None:
+        return proxy
+    escala = math.sqrt((ORCAMENTO_PREVIA - ATRASO_PREVIA) / (custo * proxy.width * proxy.height))
+    if escala >= 1:
+        return proxy
+    return proxy.resize((max(1, round(proxy.width * escala)), max(1, round(proxy.height * escala))))
+
+def montar_tarefa(filtro_selecionado, values, image):
+    # Valida os parâmetros do filtro e monta a chamada (sem executá-la);
+    # parâmetros inválidos levantam ValueError com a mensagem para o usuário
+    if filtro_selecionado == "Limiriazação":
+        try:
+            limiar_usuario = int(values["-VALOR_LIMIAR-"])
+            if not (0 <= limiar_usuario <= 255):
+                raise ValueError
+        except:
+            raise ValueError("Digite um valor de limiar entre 0 e 255.")
+
+        return partial(limiarizacao, image, limiar=limiar_usuario)
+
+    if filtro_selecionado == "Escala de Cinza":
+        return partial(filtro_cinza, image)
+
+    if filtro_selecionado == "Passa-Alta Básico":
+        if values["-KERNEL_PA_4-"]:
+            tipo_kernel_escolhido = 'laplaciano_4'
+        else:
+            tipo_kernel_escolhido = 'laplaciano_8'
+        
+        return partial(passa_alta_basico, image, tipo_kernel=tipo_kernel_escolhido)
+
+    if filtro_selecionado == "Passa-Alta Alto Reforço":
+        try:
+            fator_k_usuario = float(values["-VALOR_FATOR_K-"])
+        except ValueError:
+            raise ValueError("O Fator de Reforço (k) deve ser um número (ex: 1.0, 1.5).")
+
+        if values["-KERNEL_PA_4-"]:
+            tipo_kernel_escolhido = 'laplaciano_4'
+        else:
+            tipo_kernel_escolhido = 'laplaciano_8'
+
+        return partial(
+            passa_alta_alto_reforco,
+            image, 
+            fator_k=fator_k_usuario, 
+            tipo_kernel_base=tipo_kernel_escolhido,
+            recortar_bordas=values["-REFORCO_RECORTADO-"]
+        )
+
+    if filtro_selecionado in ("Passa-Baixa Média", "Passa-Baixa Mediana"):
+        try:
+            kernel_usuario = int(values["-VALOR_KERNEL-"])
+            if kernel_usuario % 2 == 0 or kernel_usuario < 3:
+                raise ValueError
+        except:
+            raise ValueError("Digite um valor de kernel ímpar e ≥ 3.")
+
+        if filtro_selecionado == "Passa-Baixa Média":
+            return partial(passa_baixa_media, image, kernel_usuario)
+
+        if values["-MEDIANA_IMPULSOS-"]:
+            modo_mediana = 'impulsos'
+        else:
+            modo_mediana = 'completo'
+
+        return partial(passa_baixa_mediana, image, kernel_usuario, modo=modo_mediana)
+
+    if filtro_selecionado == "Roberts":
+        return partial(filtro_roberts, image)
+
+    if filtro_selecionado == "Prewitt":
+        return partial(filtro_prewitt, image)
+
+    if filtro_selecionado == "Sobel":
+        if values["-DIR_GX-"]:
+            direcao_escolhida = 'horizontal'
+        elif values["-DIR_GY-"]:
+            direcao_escolhida = 'vertical'
+        else:
+            direcao_escolhida = 'ambos'
+
+        if values["-POS_NORM-"]:
+            pos_proc_escolhido = 'normalizacao'
+        else:
+            pos_proc_escolhido = 'clipping'
+
+        return partial(
+            filtro_sobel,
+            image, 
+            direcao=direcao_escolhida, 
+            pos_processamento=pos_proc_escolhido
+        )
+
+    if filtro_selecionado == "Transformação Logarítmica":
+        return partial(transformacao_logaritmica, image)
+
+    if filtro_selecionado == "Operações Aritméticas":
+        caminho_img2 = values["-SEGUNDA_IMAGEM-"]
+        operacao = values["-OPERACAO_ARITMETICA-"]
+        try:
+            escalar = float(values["-VALOR_ESCALAR-"])
+        except:
+            raise ValueError("Digite um valor numérico válido para o escalar.")
+
+        if not caminho_img2 or not os.path.exists(caminho_img2):
+            raise ValueError("Selecione uma segunda imagem válida.")
+
+        if operacao not in ("soma", "subtracao", "multiplicacao"):
+            raise ValueError("Selecione uma operação válida.")
+
+        try:
+            imagem2 = Image.open(caminho_img2)
+        except Exception as e:
+            raise ValueError(f"Erro ao processar imagens: {e}")
+
+        return partial(operacao_com_segunda_imagem, image, imagem2, operacao, escalar)
+
+    if filtro_selecionado == "Ruídos": 
+        try:
+            taxa_ruido_usuario = float(values["-VALOR_TAXA_RUIDO-"])
+        except ValueError:
+            raise ValueError("A Taxa de Ruído deve ser um número válido (ex: 0.05).")
+
+        if not (0.0 <= taxa_ruido_usuario <= 1.0):
+            raise ValueError("A Taxa de Ruído deve ser um número entre 0.0 e 1.0.")
+            
+        return partial(filtro_ruidos, image, taxa_ruido=taxa_ruido_usuario)
+
+    if filtro_selecionado == "Histograma":
+        # Verificar se a imagem já está em escala de cinza
+        # Se não estiver, converter para escala de cinza primeiro;
+        # o histograma é exibido quando a conversão termina
+        if image.mode != 'L':
+            return partial(filtro_cinza, image)
+        return partial(image.copy)
+
+    if filtro_selecionado == "Equalização de Histograma":
+        # Aplicar equalização manual seguindo os 3 passos
+        modo_equalizacao = 'luminancia' if values["-EQUALIZACAO_LUMINANCIA-"] else 'cinza'
+        return partial(equalizar_histograma, image, modo=modo_equalizacao)
+
+    if filtro_selecionado == "Especificação de Histograma":
+        caminho_referencia = values["-SEGUNDA_IMAGEM-"]
+        if not caminho_referencia or not os.path.exists(caminho_referencia):
+            raise ValueError("Selecione uma imagem de referência válida.")
+
+        modo_especificacao = 'luminancia' if values["-EQUALIZACAO_LUMINANCIA-"] else 'cinza'
+        return partial(especificar_histograma, image, Image.open(caminho_referencia),
+                       modo=modo_especificacao)
+
+    if filtro_selecionado == "Equalização Adaptativa (CLAHE)":
+        try:
+            limite_corte = float(values["-VALOR_LIMITE_CORTE-"])
+        except ValueError:
+            raise ValueError("O Limite de Contraste deve ser um número (ex: 2.0).")
+
+        return partial(equalizar_histograma_adaptativa, image, limite_corte=limite_corte)
+
+    return None
 
 
 # Janela
@@ -223,15 +475,109 @@ window.maximize()
 #Declaração de variavel
 filtro_selecionado = None
 image = None
+proxy = None
 segunda_image = None
 
+# Os filtros rodam em segundo plano; a janela continua respondendo
+tarefas = ExecutorTarefas(window)
+filtro_em_execucao = None
+
+# Prévias ao vivo, num executor próprio: a prévia não cancela nem espera a imagem completa
+previas = ExecutorTarefas(window, evento='-PREVIA_CONCLUIDA-')
+previa_em = None        # instante em que a prévia agendada deve ser calculada
+filtro_previa = None
+refino = None           # conversão da imagem completa, enviada quando a prévia chega
+custo_previa = {}       # filtro -> segundos por pixel na última prévia
+
 
 #Ler Eventos
 while True:
-    event, values = window.read()
+    # Acorda na hora da prévia agendada e, durante uma conversão, a cada 100 ms para o indicador
+    esperas = []
+    if previa_em is not None:
+        esperas.append(max(0, int((previa_em - time.perf_counter()) * 1000)))
+    if tarefas.ocupado:
+        esperas.append(100)
+    event, values = window.read(timeout=min(esperas) if esperas else None)
     if event == 'Exit' or event == sg.WIN_CLOSED:
         break
 
+    if event == sg.TIMEOUT_EVENT:
+        if previa_em is not None and time.perf_counter() >= previa_em:
+            previa_em = None
+            try:
+                # Prévia na imagem reduzida (menor ainda para filtros lentos)...
+                imagem_previa = reduzir_para_orcamento(proxy, custo_previa.get(filtro_selecionado))
+                tarefa_previa = montar_tarefa(filtro_selecionado, values, imagem_previa)
+                # ...e depois a imagem completa, que substitui a prévia sempre
+                # que ela tiver sido calculada numa imagem menor
+                refino = (None if imagem_previa is image
+                          else montar_tarefa(filtro_selecionado, values, image))
+            except ValueError as erro:
+                # Parâmetros incompletos durante a digitação: mantém o último resultado
+                mostrar_status(str(erro))
+            else:
+                filtro_previa = filtro_selecionado
+                previas.enviar(tarefa_previa)
+        elif tarefas.ocupado:
+            if tarefas.tempo_restante is None:
+                mostrar_status(f"Processando... {tarefas.tempo_decorrido:.1f} s", ocupado=True)
+            else:
+                mostrar_status(f"Processando... {tarefas.progresso:.0%} "
+                               f"(faltam {tarefas.tempo_restante:.1f} s)", ocupado=True)
+        continue
+
+    if event == previas.evento:
+        tempo = previas.tempo_decorrido
+        conclusao = previas.concluir(values[event])
+        if conclusao is None:
+            continue
+
+        resultado, erro = conclusao
+        if erro is not None:
+            mostrar_status(f"Erro na prévia: {erro}")
+            continue
+
+        custo_previa[filtro_previa] = tempo / (resultado.width * resultado.height)
+        exibir_resultado(resultado, proxy.size)
+        if refino is None:
+            mostrar_status(f"Prévia em {tempo * 1000:.0f} ms")
+        else:
+            filtro_em_execucao = filtro_previa
+            tarefas.enviar(refino)
+            refino = None
+            mostrar_status(f"Prévia em {tempo * 1000:.0f} ms; refinando...", ocupado=True)
+        continue
+
+    if event == tarefas.evento:
+        tempo = tarefas.tempo_decorrido
+        conclusao = tarefas.concluir(values[event])
+        if conclusao is None:
+            # Resultado de uma conversão cancelada ou substituída
+            continue
+
+        resultado, erro = conclusao
+        if erro is not None:
+            mostrar_status("")
+            sg.popup_error(f"Erro ao aplicar o filtro: {erro}")
+            continue
+
+        mostrar_status(f"Concluído em {tempo:.1f} s")
+        exibir_resultado(resultado)
+
+        if filtro_em_execucao == "Histograma":
+            # Gerar e exibir o histograma
+            gerar_histograma(resultado)
+        continue
+
+    # Trocar de filtro, de parâmetros ou de imagem cancela a prévia e a conversão em andamento
+    if event in ("-CANCELAR-", "-LISTA_FILTROS-", "Carregar Imagem") or event in EVENTOS_PARAMETROS:
+        previas.cancelar()
+        refino = None
+        if tarefas.ocupado:
+            tarefas.cancelar()
+            mostrar_status("Cancelado")
+
     if event == "-LISTA_FILTROS-" and values["-LISTA_FILTROS-"]:
         filtro_selecionado = values["-LISTA_FILTROS-"][0]
         window["-FILTRO_ATUAL-"].update(filtro_selecionado)
@@ -242,24 +588,32 @@ while True:
     if event == "Carregar Imagem":
         filename = values["file_path"]
         if os.path.exists(filename):
+            # A imagem fica na resolução original (e já decodificada, pois
+            # as conversões a leem em outras threads); só a exibição é reduzida
             image = Image.open(values["file_path"])
-            image.thumbnail((400,400))
-            image_bytes = io.BytesIO()
-            image.save(image_bytes, format="PNG")
-            print(image_bytes.getvalue())
-            window["imagem"].update(data=image_bytes.getvalue())
+            image.load()
+            # A miniatura de exibição é também a imagem da prévia ao vivo
+            proxy = miniatura(image)
+            exibir("imagem", image)
     
     if event == "-CARREGAR_SEGUNDA-":
         caminho_segunda = values["-SEGUNDA_IMAGEM-"]
         if os.path.exists(caminho_segunda):
-            segunda_image = Image.open(caminho_segunda)
-            segunda_image.thumbnail((400, 400))
-            image_bytes = io.BytesIO()
-            segunda_image.save(image_bytes, format="PNG")
-            window["segunda_imagem"].update(data=image_bytes.getvalue(), visible=True)
+            exibir_segunda_imagem(caminho_segunda)
         else:
             sg.popup_error("Arquivo da segunda imagem não encontrado.")
 
+    if event == "-PREVIA_AO_VIVO-" and not values["-PREVIA_AO_VIVO-"]:
+        # Desligar a prévia descarta a que estiver agendada
+        previa_em = None
+
+    # Prévia ao vivo: cada edição reagenda a prévia, que só é calculada quando
+    # as edições param por ATRASO_PREVIA segundos
+    if (values["-PREVIA_AO_VIVO-"] and image is not None and filtro_selecionado
+            and filtro_selecionado not in FILTROS_SEM_PREVIA
+            and (event in EVENTOS_PARAMETROS or event in EVENTOS_PREVIA)):
+        previa_em = time.perf_counter() + ATRASO_PREVIA
+
 
     if event == "converter":
         if not values["file_path"] or image == None:
@@ -270,265 +624,25 @@ while True:
             sg.popup_error("Selecione um filtro.")
             continue
 
-        if filtro_selecionado == "Limiriazação":
-            try:
-                limiar_usuario = int(values["-VALOR_LIMIAR-"])
-                if not (0 <= limiar_usuario <= 255):
-                    raise ValueError
-            except:
-                sg.popup_error("Digite um valor de limiar entre 0 e 255.")
-                continue
-
-            imagem_convertida = limiarizacao(image, limiar=limiar_usuario)
-
-            imagem_convertida.thumbnail((400, 400))
-            image_bytes = io.BytesIO()
-            imagem_convertida.save(image_bytes, format="PNG")
-            print(image_bytes.getvalue())
-            window["resultado_imagem"].update(data=image_bytes.getvalue())
-
-        if filtro_selecionado == "Escala de Cinza":
-            imagem_convertida = filtro_cinza(image)
-
-            imagem_convertida.thumbnail((400,400))
-            image_bytes = io.BytesIO()
-            imagem_convertida.save(image_bytes, format="PNG")
-            print(image_bytes.getvalue())
-            window["resultado_imagem"].update(data=image_bytes.getvalue())
-
-        if filtro_selecionado == "Passa-Alta Básico":
-            if values["-KERNEL_PA_4-"]:
-                tipo_kernel_escolhido = 'laplaciano_4'
-            else:
-                tipo_kernel_escolhido = 'laplaciano_8'
-            
-            # Aplica o filtro
-            imagem_convertida = passa_alta_basico(image, tipo_kernel=tipo_kernel_escolhido)
-
-            # Redimensiona para caber na interface
-            imagem_convertida.thumbnail((400, 400))
-
-            # Converte para exibição
-            buf = io.BytesIO()
-            imagem_convertida.save(buf, format="PNG")
-            window["resultado_imagem"].update(data=buf.getvalue())
-
-        if filtro_selecionado == "Passa-Alta Alto Reforço":
-            try:
-                fator_k_usuario = float(values["-VALOR_FATOR_K-"])
-            except ValueError:
-                sg.popup_error("O Fator de Reforço (k) deve ser um número (ex: 1.0, 1.5).")
-                continue
-
-            if values["-KERNEL_PA_4-"]:
-                tipo_kernel_escolhido = 'laplaciano_4'
-            else:
-                tipo_kernel_escolhido = 'laplaciano_8'
-
-            # Aplica o filtro
-            imagem_convertida = passa_alta_alto_reforco(
-                image, 
-                fator_k=fator_k_usuario, 
-                tipo_kernel_base=tipo_kernel_escolhido
-            )
-
-            # Redimensiona para caber na interface
-            imagem_convertida.thumbnail((400, 400))
-
-            # Converte para exibição
-            buf = io.BytesIO()
-            imagem_convertida.save(buf, format="PNG")
-            window["resultado_imagem"].update(data=buf.getvalue())
-
-        if filtro_selecionado == "Passa-Baixa Média":
-            try:
-                kernel_usuario = int(values["-VALOR_KERNEL-"])
-                if kernel_usuario % 2 == 0 or kernel_usuario < 3:
-                    raise ValueError
-            except:
-                sg.popup_error("Digite um valor de kernel ímpar e ≥ 3.")
-                continue
-
-            imagem_convertida = passa_baixa_media(image, kernel_usuario)
-
-            imagem_convertida.thumbnail((400,400))
-            image_bytes = io.BytesIO()
-            imagem_convertida.save(image_bytes, format="PNG")
-            print(image_bytes.getvalue())
-            window["resultado_imagem"].update(data=image_bytes.getvalue())
-
-        if filtro_selecionado == "Passa-Baixa Mediana":
-            try:
-                kernel_usuario = int(values["-VALOR_KERNEL-"])
-                if kernel_usuario % 2 == 0 or kernel_usuario < 3:
-                    raise ValueError
-            except:
-                sg.popup_error("Digite um valor de kernel ímpar e ≥ 3.")
-                continue
-
-            imagem_convertida = passa_baixa_mediana(image, kernel_usuario)
-
-            imagem_convertida.thumbnail((400,400))
-            image_bytes = io.BytesIO()
-            imagem_convertida.save(image_bytes, format="PNG")
-            print(image_bytes.getvalue())
-            window["resultado_imagem"].update(data=image_bytes.getvalue())
-
-        if filtro_selecionado == "Roberts":
-            imagem_convertida = filtro_roberts(image)
-
-            imagem_convertida.thumbnail((400,400))
-            image_bytes = io.BytesIO()
-            imagem_convertida.save(image_bytes, format="PNG")
-            print(image_bytes.getvalue())
-            window["resultado_imagem"].update(data=image_bytes.getvalue())
-
-        if filtro_selecionado == "Prewitt":
-            imagem_convertida = filtro_prewitt(image)
-
-            imagem_convertida.thumbnail((400, 400))
-            image_bytes = io.BytesIO()
-            imagem_convertida.save(image_bytes, format="PNG")
-            window["resultado_imagem"].update(data=image_bytes.getvalue())
-
-        if filtro_selecionado == "Sobel":
-            if values["-DIR_GX-"]:
-                direcao_escolhida = 'horizontal'
-            elif values["-DIR_GY-"]:
-                direcao_escolhida = 'vertical'
-            else:
-                direcao_escolhida = 'ambos'
-
-            if values["-POS_NORM-"]:
-                pos_proc_escolhido = 'normalizacao'
-            else:
-                pos_proc_escolhido = 'clipping'
-
-            # Aplica o filtro
-            imagem_convertida = filtro_sobel(
-                image, 
-                direcao=direcao_escolhida, 
-                pos_processamento=pos_proc_escolhido
-            )
-
-            # Redimensiona para caber na interface
-            imagem_convertida.thumbnail((400, 400))
-
-            # Converte para exibição
-            buf = io.BytesIO()
-            imagem_convertida.save(buf, format="PNG")
-            window["resultado_imagem"].update(data=buf.getvalue())
-
-        if filtro_selecionado == "Transformação Logarítmica":
-            # Aplica o filtro
-            imagem_convertida = transformacao_logaritmica(image)
-
-            # Redimensiona para caber na interface
-            imagem_convertida.thumbnail((400, 400))
-
-            # Converte para exibição
-            buf = io.BytesIO()
-            imagem_convertida.save(buf, format="PNG")
-            window["resultado_imagem"].update(data=buf.getvalue())
+        # Cada filtro valida os parâmetros e monta a tarefa; o cálculo
+        # acontece em segundo plano e o resultado chega como evento
+        try:
+            tarefa = montar_tarefa(filtro_selecionado, values, image)
+        except ValueError as erro:
+            sg.popup_error(str(erro))
+            continue
 
         if filtro_selecionado == "Operações Aritméticas":
-            caminho_img2 = values["-SEGUNDA_IMAGEM-"]
-            operacao = values["-OPERACAO_ARITMETICA-"]
-            try:
-                escalar = float(values["-VALOR_ESCALAR-"])
-            except:
-                sg.popup_error("Digite um valor numérico válido para o escalar.")
-                continue
-
-            if not caminho_img2 or not os.path.exists(caminho_img2):
-                sg.popup_error("Selecione uma segunda imagem válida.")
-                continue
-
-            try:
-                imagem2 = Image.open(caminho_img2)
-
-                # Mostrar a segunda imagem na interface
-                imagem2_thumbnail = imagem2.copy()
-                imagem2_thumbnail.thumbnail((400, 400))
-                img2_bytes = io.BytesIO()
-                imagem2_thumbnail.save(img2_bytes, format="PNG")
-                window["segunda_imagem"].update(data=img2_bytes.getvalue(), visible=True)
-
-                # Preparar as imagens para operação
-                image1 = image.convert("RGB")
-                imagem2 = imagem2.convert("RGB").resize(image1.size)
-
-                import numpy as np
-                np1 = np.array(image1).astype(np.float32)
-                np2 = np.array(imagem2).astype(np.float32)
-
-                if operacao == "soma":
-                    resultado_np = np.clip(np1 + escalar * np2, 0, 255)
-                elif operacao == "subtracao":
-                    resultado_np = np.clip(np1 - escalar * np2, 0, 255)
-                elif operacao == "multiplicacao":
-                    resultado_np = np.clip(np1 * escalar * np2, 0, 255)
-                else:
-                    sg.popup_error("Selecione uma operação válida.")
-                    continue
-
-                resultado_img = Image.fromarray(resultado_np.astype(np.uint8))
-                resultado_img.thumbnail((400, 400))
-                img_bytes = io.BytesIO()
-                resultado_img.save(img_bytes, format="PNG")
-                window["resultado_imagem"].update(data=img_bytes.getvalue())
-
-            except Exception as e:
-                sg.popup_error(f"Erro ao processar imagens: {e}")
-
-        if filtro_selecionado == "Ruídos": 
-            try:
-                taxa_ruido_usuario = float(values["-VALOR_TAXA_RUIDO-"])
-                if not (0.0 <= taxa_ruido_usuario <= 1.0):
-                    sg.popup_error("A Taxa de Ruído deve ser um número entre 0.0 e 1.0.")
-                    continue
-                
-                # Aplica o ruído
-                imagem_convertida = filtro_ruidos(image, taxa_ruido=taxa_ruido_usuario)
-
-                # Redimensiona para caber na interface
-                imagem_convertida.thumbnail((400, 400))
-
-                # Converte para exibição
-                buf = io.BytesIO()
-                imagem_convertida.save(buf, format="PNG")
-                window["resultado_imagem"].update(data=buf.getvalue())
-
-            except ValueError:
-                sg.popup_error("A Taxa de Ruído deve ser um número válido (ex: 0.05).")
-                continue
-
-        if filtro_selecionado == "Histograma":
-            # Verificar se a imagem já está em escala de cinza
-            # Se não estiver, converter para escala de cinza primeiro
-            if image.mode != 'L':
-                imagem_cinza = filtro_cinza(image)
-            else:
-                imagem_cinza = image
-            
-            # Gerar e exibir o histograma
-            gerar_histograma(imagem_cinza)
-            
-            # Opcional: Mostrar a imagem em escala de cinza na interface
-            imagem_cinza.thumbnail((400,400))
-            image_bytes = io.BytesIO()
-            imagem_cinza.save(image_bytes, format="PNG")
-            window["resultado_imagem"].update(data=image_bytes.getvalue())
-
-        if filtro_selecionado == "Equalização de Histograma":
-            # Aplicar equalização manual seguindo os 3 passos
-            imagem_equalizada = equalizar_histograma(image)
-            
-            # Exibir a imagem equalizada na interface
-            imagem_equalizada.thumbnail((400,400))
-            image_bytes = io.BytesIO()
-            imagem_equalizada.save(image_bytes, format="PNG")
-            window["resultado_imagem"].update(data=image_bytes.getvalue())
+            exibir_segunda_imagem(values["-SEGUNDA_IMAGEM-"])
+
+        if tarefa is not None:
+            # Uma nova conversão substitui a que estiver em andamento (e a prévia agendada)
+            previa_em = None
+            previas.cancelar()
+            refino = None
+            filtro_em_execucao = filtro_selecionado
+            tarefas.enviar(tarefa)
+            mostrar_status("Processando...", ocupado=True)
         
 
-window.close()
\ No newline at end of file
+window.close()
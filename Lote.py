@@ -0,0 +1,274 @@
+from PIL import Image
+
+import argparse
+import glob
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from Catalogo import filtros_disponiveis, parametros_padrao, aplicar_filtro
+from Histograma import acumular_histogramas, perfil_referencia
+
+#
+    # Processamento em lote (linha de comando)
+#
+# Uso:
+#   python -m Lote "Passa-Baixa Média" fotos/ -o saida/ --kernel 5
+#   python -m Lote Sobel "scans/*.tif" -o bordas/ --pos-processamento normalizacao --trabalhadores 8
+#
+
+EXTENSOES_IMAGEM = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tif', '.tiff', '.webp')
+
+# Marca o fim de uma fila
+_FIM = None
+
+def listar_imagens(entradas):
+    """
+    Expande diretórios e padrões glob numa lista ordenada de arquivos de imagem.
+
+    Parâmetros:
+    -----------
+    entradas : list of str
+        Diretórios, arquivos ou padrões glob (ex.: 'fotos/**/*.png').
+
+    Retorna:
+    --------
+    list of str
+        Caminhos dos arquivos encontrados, sem repetições.
+    """
+    caminhos = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            candidatos = [os.path.join(entrada, nome) for nome in os.listdir(entrada)]
+        else:
+            candidatos = glob.glob(entrada, recursive=True)
+        caminhos.extend(c for c in candidatos
+                        if os.path.isfile(c) and c.lower().endswith(EXTENSOES_IMAGEM))
+    return sorted(set(caminhos))
+
+def _ler(caminhos, fila_leitura, erros):
+    """
+    Estágio de leitura: decodifica as imagens à frente do processamento.
+    """
+    for caminho in caminhos:
+        try:
+            with Image.open(caminho) as imagem:
+                imagem.load()
+                fila_leitura.put((caminho, os.path.getsize(caminho), imagem))
+        except Exception as erro:
+            erros.append((caminho, erro))
+    fila_leitura.put(_FIM)
+
+def _destino(caminho, diretorio_saida, formato):
+    """
+    Caminho de saída de uma entrada: o mesmo nome, com a extensão de `formato`.
+    """
+    nome, extensao = os.path.splitext(os.path.basename(caminho))
+    return os.path.join(diretorio_saida, nome + (formato or extensao))
+
+def _escrever(fila_escrita, diretorio_saida, formato, erros, contagem):
+    """
+    Estágio de escrita: codifica e grava os resultados atrás do processamento.
+    """
+    while True:
+        item = fila_escrita.get()
+        if item is _FIM:
+            return
+        caminho, tamanho, imagem = item
+        destino = _destino(caminho, diretorio_saida, formato)
+        try:
+            if destino.lower().endswith(('.jpg', '.jpeg')) and imagem.mode not in ('L', 'RGB'):
+                imagem = imagem.convert('RGB')
+            imagem.save(destino)
+            contagem['imagens'] += 1
+            contagem['bytes'] += tamanho
+        except Exception as erro:
+            erros.append((caminho, erro))
+
+# Filtro e parâmetros de cada processo trabalhador, definidos uma vez por processo
+_TRABALHO = {}
+
+def _iniciar_trabalhador(nome_filtro, parametros):
+    _TRABALHO['filtro'] = nome_filtro
+    _TRABALHO['parametros'] = parametros
+
+def _processar(caminho, tamanho, imagem):
+    return caminho, tamanho, aplicar_filtro(_TRABALHO['filtro'], imagem, _TRABALHO['parametros'])
+
+def processar_lote(nome_filtro, entradas, diretorio_saida, parametros=None, trabalhadores=None,
+                   formato=None, tamanho_fila=None):
+    """
+    Aplica um filtro do catálogo a várias imagens num pipeline de três estágios.
+
+    Uma thread decodifica as imagens à frente, um pool de processos aplica
+    o filtro e outra thread codifica e grava os resultados. Os estágios se
+    comunicam por filas limitadas, então a memória fica limitada a poucas
+    imagens em trânsito, e a leitura e a escrita se sobrepõem ao cálculo.
+
+    Parâmetros:
+    -----------
+    nome_filtro : str
+        Nome do filtro, como em `Catalogo.filtros_disponiveis`.
+    entradas : list of str
+        Diretórios, arquivos ou padrões glob.
+    diretorio_saida : str
+        Diretório onde os resultados são gravados (criado se não existir).
+    parametros : dict, opcional
+        Parâmetros do filtro (ver `Catalogo.parametros_padrao`).
+    trabalhadores : int, opcional
+        Processos do pool. Default = número de CPUs; com 1, o filtro roda
+        no processo principal.
+    formato : str, opcional
+        Extensão de saída (ex.: '.png'). Default = a mesma da entrada.
+        Entradas que resultariam no mesmo arquivo de saída não são
+        sobrescritas: só a primeira é processada e as demais vão para 'erros'.
+    tamanho_fila : int, opcional
+        Capacidade das filas de leitura e escrita. Default = 2 x trabalhadores.
+
+    Na equalização de histograma com o parâmetro 'equalizacao_global', uma
+    passada inicial acumula o histograma de todas as imagens (dividida entre
+    os trabalhadores) e todas são equalizadas com a mesma transformação.
+    Na especificação de histograma, o perfil da imagem de referência
+    ('segunda_imagem') também é calculado uma única vez.
+
+    Retorna:
+    --------
+    dict
+        'imagens', 'bytes', 'segundos' e 'erros' (lista de (caminho, erro)).
+    """
+    trabalhadores = trabalhadores or os.cpu_count() or 1
+    tamanho_fila = tamanho_fila or 2 * trabalhadores
+    caminhos = listar_imagens(entradas)
+    os.makedirs(diretorio_saida, exist_ok=True)
+
+    erros = []
+
+    # Entradas com o mesmo destino (ex.: 'a.png' e 'a.jpg' com formato '.png')
+    # sobrescreveriam umas às outras: só a primeira é processada
+    destinos = {}
+    for caminho in caminhos:
+        destino = os.path.normcase(_destino(caminho, diretorio_saida, formato))
+        if destino in destinos:
+            erros.append((caminho, FileExistsError(
+                f"'{caminho}' e '{destinos[destino]}' seriam gravados em '{destino}'.")))
+        else:
+            destinos[destino] = caminho
+    caminhos = list(destinos.values())
+
+    # Estatísticas compartilhadas por todo o lote, calculadas antes do pipeline
+    if nome_filtro == "Equalização de Histograma" and (parametros or {}).get("equalizacao_global"):
+        # Arquivos ilegíveis entram em `erros` e ficam fora do histograma e do lote
+        histograma = acumular_histogramas(caminhos, processos=trabalhadores, erros=erros)
+        ilegiveis = {caminho for caminho, _ in erros}
+        caminhos = [caminho for caminho in caminhos if caminho not in ilegiveis]
+        parametros = dict(parametros, histograma=histograma)
+    if nome_filtro == "Especificação de Histograma" and isinstance((parametros or {}).get("segunda_imagem"), str):
+        # O perfil de referência é calculado uma vez para todo o lote
+        with Image.open(parametros["segunda_imagem"]) as referencia:
+            parametros = dict(parametros, perfil=perfil_referencia(referencia))
+
+    fila_leitura = queue.Queue(maxsize=tamanho_fila)
+    fila_escrita = queue.Queue(maxsize=tamanho_fila)
+    contagem = {'imagens': 0, 'bytes': 0}
+
+    inicio = time.perf_counter()
+    leitor = threading.Thread(target=_ler, args=(caminhos, fila_leitura, erros), daemon=True)
+    escritor = threading.Thread(target=_escrever, args=(fila_escrita, diretorio_saida, formato,
+                                                        erros, contagem), daemon=True)
+    leitor.start()
+    escritor.start()
+
+    if trabalhadores == 1:
+        _iniciar_trabalhador(nome_filtro, parametros)
+        for item in iter(fila_leitura.get, _FIM):
+            try:
+                fila_escrita.put(_processar(*item))
+            except Exception as erro:
+                erros.append((item[0], erro))
+    else:
+        with ProcessPoolExecutor(trabalhadores, initializer=_iniciar_trabalhador,
+                                 initargs=(nome_filtro, parametros)) as executor:
+            pendentes = {}
+
+            def entregar(concluidos):
+                for futuro in concluidos:
+                    caminho = pendentes.pop(futuro)
+                    try:
+                        fila_escrita.put(futuro.result())
+                    except Exception as erro:
+                        erros.append((caminho, erro))
+
+            for item in iter(fila_leitura.get, _FIM):
+                pendentes[executor.submit(_processar, *item)] = item[0]
+                # Limita as imagens em processamento para não acumular memória
+                if len(pendentes) >= tamanho_fila:
+                    concluidos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                    entregar(concluidos)
+            entregar(list(pendentes))
+
+    fila_escrita.put(_FIM)
+    leitor.join()
+    escritor.join()
+
+    contagem['segundos'] = time.perf_counter() - inicio
+    contagem['erros'] = erros
+    return contagem
+
+def _argumentos():
+    parser = argparse.ArgumentParser(
+        prog='python -m Lote',
+        description='Aplica um filtro a um diretório ou padrão glob de imagens.')
+    parser.add_argument('filtro', choices=[f for f in filtros_disponiveis if f != "Histograma"],
+                        metavar='filtro', help='Nome do filtro, como na interface (ex.: "Sobel").')
+    parser.add_argument('entradas', nargs='+', help='Diretórios, arquivos ou padrões glob.')
+    parser.add_argument('-o', '--saida', required=True, help='Diretório de saída.')
+    parser.add_argument('--formato', help='Extensão de saída (ex.: .png). Padrão: a da entrada.')
+    parser.add_argument('--trabalhadores', type=int, help='Processos do pool. Padrão: número de CPUs.')
+    parser.add_argument('--tamanho-fila', type=int, help='Capacidade das filas entre os estágios.')
+
+    p = parametros_padrao
+    parser.add_argument('--limiar', type=int, default=p["limiar"])
+    parser.add_argument('--kernel', type=int, default=p["kernel"])
+    parser.add_argument('--impulsos', dest='mediana_impulsos', action='store_true',
+                        help='Mediana apenas nos pixels 0/255.')
+    parser.add_argument('--kernel-pa', dest='kernel_pa_basico', default=p["kernel_pa_basico"],
+                        choices=['laplaciano_4', 'laplaciano_8'])
+    parser.add_argument('--fator-k', type=float, default=p["fator_k"])
+    parser.add_argument('--reforco-recortado', dest='reforco_recortado', action='store_true',
+                        help='Alto reforço com o Laplaciano recortado em [0, 255] (comportamento anterior).')
+    parser.add_argument('--direcao', default=p["direcao"], choices=['ambos', 'horizontal', 'vertical'])
+    parser.add_argument('--pos-processamento', default=p["pos_processamento"],
+                        choices=['clipping', 'normalizacao'])
+    parser.add_argument('--taxa-ruido', type=float, default=p["taxa_ruido"])
+    parser.add_argument('--operacao', default=p["operacao"], choices=['soma', 'subtracao', 'multiplicacao'])
+    parser.add_argument('--segunda-imagem', default=p["segunda_imagem"],
+                        help='Segunda imagem das operações aritméticas ou referência da especificação.')
+    parser.add_argument('--escalar', type=float, default=p["escalar"])
+    parser.add_argument('--equalizacao-global', action='store_true',
+                        help='Equaliza todas as imagens com o histograma do conjunto.')
+    parser.add_argument('--luminancia', dest='equalizacao_luminancia', action='store_true',
+                        help='Equaliza só a luminância (YCbCr), preservando as cores.')
+    parser.add_argument('--limite-corte', type=float, default=p["limite_corte"],
+                        help='Limite de contraste da equalização adaptativa (CLAHE).')
+    return parser.parse_args()
+
+def main():
+    args = _argumentos()
+    parametros = {chave: getattr(args, chave) for chave in parametros_padrao}
+
+    resultado = processar_lote(args.filtro, args.entradas, args.saida, parametros,
+                               trabalhadores=args.trabalhadores, formato=args.formato,
+                               tamanho_fila=args.tamanho_fila)
+
+    for caminho, erro in resultado['erros']:
+        print(f"Erro em {caminho}: {erro}")
+
+    segundos = max(resultado['segundos'], 1e-9)
+    print(f"{resultado['imagens']} imagens em {segundos:.2f} s: "
+          f"{resultado['imagens'] / segundos:.2f} imagens/s, "
+          f"{resultado['bytes'] / 1e6 / segundos:.2f} MB/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import numpy as np
+
+from Filtros import limiarizacao, transformacao_logaritmica, operacoes_aritmeticas
+from Filtros import _aplicar_tabela, _tabela_limiar, _tabela_logaritmica, _tabela_multiplicacao
+from Histograma import equalizar_histograma, calcular_pdf, calcular_cdf, tabela_equalizacao
+from Histograma import HistogramaAcumulado
+
+#
+    # Pipeline preguiçoso com fusão de operações pontuais
+#
+
+def _tabela_equalizacao_histograma(histograma):
+    """
+    Tabela da equalização a partir de um histograma de 256 contagens,
+    seguindo os mesmos passos (PDF, CDF) de `equalizar_histograma`.
+    """
+    if isinstance(histograma, HistogramaAcumulado):
+        histograma = histograma.histograma()
+    contagens = [int(c) for c in histograma]
+    return tabela_equalizacao(calcular_cdf(calcular_pdf(contagens, sum(contagens))))
+
+# Operações pontuais que viram tabelas de consulta: filtro -> (precisa do histograma, construtor).
+# O construtor recebe os parâmetros nomeados da etapa e, se precisar, o histograma atual.
+_OPERACOES_PONTUAIS = {
+    limiarizacao: (False, lambda p, h: _tabela_limiar(p['limiar'])),
+    transformacao_logaritmica: (False, lambda p, h: _tabela_logaritmica()),
+    operacoes_aritmeticas: (False, lambda p, h: _tabela_multiplicacao(p['escalar'])),
+    # Com um histograma global (de um conjunto), a tabela não depende da imagem
+    equalizar_histograma: (True, lambda p, h: _tabela_equalizacao_histograma(
+        h if p.get('histograma') is None else p['histograma'])),
+}
+
+# Nomes dos parâmetros de cada operação pontual (sem a imagem)
+_PARAMETROS = {
+    limiarizacao: ('limiar',),
+    transformacao_logaritmica: (),
+    operacoes_aritmeticas: ('operacao', 'imagem2', 'escalar'),
+    equalizar_histograma: ('threads', 'histograma', 'modo'),
+}
+
+class Pipeline:
+    """
+    Sequência preguiçosa de operações de `Filtros.py` e `Histograma.py`.
+
+    As etapas são apenas registradas com `aplicar` e só são executadas
+    quando o resultado é pedido (`resultado` ou `executar`). Antes da
+    execução, etapas pontuais consecutivas (limiarização, transformação
+    logarítmica, multiplicação por escalar e equalização de histograma) são
+    compostas numa única tabela de 256 entradas, e a imagem é convertida
+    para escala de cinza uma só vez. Assim, uma cadeia custa uma passada por
+    filtro de vizinhança e uma passada no total para as operações pontuais
+    (mais a contagem do histograma, se houver equalização). O resultado é
+    idêntico ao de aplicar as funções uma a uma.
+
+    Exemplo:
+    --------
+    >>> resultado = (Pipeline(imagem)
+    ...              .aplicar(passa_baixa_media, 3)
+    ...              .aplicar(transformacao_logaritmica)
+    ...              .aplicar(operacoes_aritmeticas, "multiplicacao", escalar=1.5)
+    ...              .aplicar(equalizar_histograma)
+    ...              .resultado())
+    """
+
+    def __init__(self, imagem=None):
+        """
+        Parâmetros:
+        -----------
+        imagem : PIL.Image, opcional
+            Imagem de entrada usada por `resultado`. Um pipeline sem imagem
+            pode ser reaplicado a várias imagens com `executar`.
+        """
+        self._imagem = imagem
+        self._etapas = []
+        self._resultado = None
+
+    def aplicar(self, filtro, *args, **kwargs):
+        """
+        Registra uma etapa (sem executá-la) e retorna o próprio pipeline.
+
+        Parâmetros:
+        -----------
+        filtro : função
+            Função que recebe uma PIL.Image como primeiro argumento e retorna
+            uma PIL.Image.
+        *args, **kwargs :
+            Parâmetros da função (sem a imagem).
+        """
+        if filtro is operacoes_aritmeticas:
+            # Validado já ao registrar, como faria a chamada direta do filtro
+            parametros = _parametros(filtro, args, kwargs)
+            if parametros.get('operacao') == 'multiplicacao' and parametros.get('escalar') is None:
+                raise ValueError("É necessário fornecer um valor escalar para a multiplicação.")
+        self._etapas.append((filtro, args, kwargs))
+        self._resultado = None
+        return self
+
+    def resultado(self):
+        """
+        Executa o pipeline na imagem de entrada (uma única vez) e retorna o resultado.
+        """
+        if self._imagem is None:
+            raise ValueError("O pipeline não tem imagem de entrada; use executar(imagem).")
+        if self._resultado is None:
+            self._resultado = self.executar(self._imagem)
+        return self._resultado
+
+    def executar(self, imagem):
+        """
+        Executa o pipeline em uma imagem, com as operações pontuais fundidas.
+
+        Parâmetros:
+        -----------
+        imagem : PIL.Image
+            Imagem de entrada.
+
+        Retorna:
+        --------
+        PIL.Image
+            Imagem resultante.
+        """
+        for tipo, etapas in self._estagios():
+            if tipo == 'pontual':
+                imagem = _executar_pontuais(imagem, etapas)
+            else:
+                filtro, args, kwargs = etapas[0]
+                imagem = filtro(imagem, *args, **kwargs)
+        return imagem
+
+    def plano(self):
+        """
+        Descreve os estágios que serão executados, após a fusão.
+
+        Retorna:
+        --------
+        list of str
+            Um item por passada; as operações pontuais fundidas aparecem
+            juntas, como 'tabela(limiarizacao + transformacao_logaritmica)'.
+        """
+        descricao = []
+        for tipo, etapas in self._estagios():
+            nomes = [filtro.__name__ for filtro, _, _ in etapas]
+            descricao.append(f"tabela({' + '.join(nomes)})" if tipo == 'pontual' else nomes[0])
+        return descricao
+
+    def _estagios(self):
+        """
+        Agrupa as etapas em estágios: sequências de operações pontuais ou um filtro.
+        """
+        estagios = []
+        for etapa in self._etapas:
+            if _pontual(etapa):
+                if estagios and estagios[-1][0] == 'pontual':
+                    estagios[-1][1].append(etapa)
+                else:
+                    estagios.append(('pontual', [etapa]))
+            else:
+                estagios.append(('filtro', [etapa]))
+        return estagios
+
+def _parametros(filtro, args, kwargs):
+    parametros = dict(zip(_PARAMETROS[filtro], args))
+    parametros.update(kwargs)
+    return parametros
+
+def _pontual(etapa):
+    """
+    Indica se uma etapa pode ser expressa como tabela de consulta.
+    """
+    filtro, args, kwargs = etapa
+    if filtro not in _OPERACOES_PONTUAIS:
+        return False
+    if filtro is operacoes_aritmeticas:
+        # Só a multiplicação por escalar depende apenas do nível do pixel
+        return _parametros(filtro, args, kwargs).get('operacao') == 'multiplicacao'
+    if filtro is equalizar_histograma:
+        # A equalização da luminância devolve uma imagem colorida
+        return _parametros(filtro, args, kwargs).get('modo', 'cinza') == 'cinza'
+    return True
+
+def _executar_pontuais(imagem, etapas):
+    """
+    Compõe as tabelas de uma sequência de operações pontuais e aplica uma vez.
+    """
+    # Todas as operações pontuais trabalham em escala de cinza: converte só uma vez
+    cinza = imagem if imagem.mode == 'L' else imagem.convert('L')
+
+    tabela = np.arange(256, dtype=np.uint8)
+    histograma = None
+    for filtro, args, kwargs in etapas:
+        precisa_histograma, construtor = _OPERACOES_PONTUAIS[filtro]
+        histograma_atual = None
+        if precisa_histograma:
+            if histograma is None:
+                histograma = np.bincount(np.asarray(cinza).ravel(), minlength=256)
+            # Histograma da imagem após as tabelas anteriores, sem aplicá-las
+            histograma_atual = np.bincount(tabela, weights=histograma, minlength=256)
+        tabela = construtor(_parametros(filtro, args, kwargs), histograma_atual)[tabela]
+
+    return _aplicar_tabela(cinza, tabela)
@@ -0,0 +1,162 @@
+import inspect
+import threading
+import time
+
+#
+    # Execução de filtros em segundo plano (interface)
+#
+
+class ExecutorTarefas:
+    """
+    Executa filtros em threads de fundo e entrega os resultados como eventos da janela.
+
+    Cada chamada de `enviar` cancela a tarefa anterior: o resultado de uma
+    tarefa cancelada é descartado e nunca chega à janela, então a interface
+    sempre mostra o resultado da última tarefa pedida. A tarefa nova começa
+    imediatamente, sem esperar a anterior terminar (as operações do NumPy
+    liberam o GIL).
+
+    Funções que aceitam o parâmetro `progresso` (os filtros de `Filtros.py`
+    e `Histograma.py`) recebem uma função de acompanhamento: a fração
+    concluída fica disponível em `progresso` e, ao cancelar, a função
+    retorna False e o filtro para na próxima faixa de linhas, sem gastar
+    CPU com um resultado que será descartado.
+
+    O resultado chega no laço de eventos como o evento `evento`, com
+    `values[evento] == (identificador, resultado, erro)`; use `concluir` para
+    descartar resultados de tarefas que já foram substituídas.
+
+    Exemplo:
+    --------
+    >>> tarefas = ExecutorTarefas(window)
+    >>> tarefas.enviar(passa_baixa_mediana, imagem, 7)
+    >>> # no laço de eventos:
+    >>> if event == tarefas.evento:
+    ...     conclusao = tarefas.concluir(values[event])   # None se foi cancelada
+    """
+
+    def __init__(self, window, evento='-TAREFA_CONCLUIDA-'):
+        """
+        Parâmetros:
+        -----------
+        window : FreeSimpleGUI.Window
+            Janela que recebe os eventos de conclusão.
+        evento : str, opcional
+            Chave do evento de conclusão. Default = '-TAREFA_CONCLUIDA-'
+        """
+        self.window = window
+        self.evento = evento
+        self._trava = threading.Lock()
+        self._identificador = 0
+        self._cancelada = None
+        self._inicio = None
+        self._fracao = None
+
+    def enviar(self, funcao, *args, **kwargs):
+        """
+        Cancela a tarefa atual (se houver) e começa `funcao(*args, **kwargs)` em segundo plano.
+
+        Retorna:
+        --------
+        int
+            Identificador da nova tarefa.
+        """
+        with self._trava:
+            if self._cancelada is not None:
+                self._cancelada.set()
+            self._identificador += 1
+            identificador = self._identificador
+            cancelada = self._cancelada = threading.Event()
+            self._inicio = time.perf_counter()
+            self._fracao = None
+
+        def acompanhar(fracao):
+            # Só a tarefa atual atualiza a fração; False interrompe o filtro
+            if not cancelada.is_set():
+                self._fracao = fracao
+            return not cancelada.is_set()
+
+        if 'progresso' in _parametros(funcao) and 'progresso' not in kwargs:
+            kwargs['progresso'] = acompanhar
+
+        def executar():
+            resultado, erro = None, None
+            try:
+                resultado = funcao(*args, **kwargs)
+            except Exception as excecao:
+                erro = excecao
+            # Tarefas canceladas (inclusive as interrompidas com
+            # OperacaoCancelada) terminam em silêncio
+            if not cancelada.is_set():
+                self.window.write_event_value(self.evento, (identificador, resultado, erro))
+
+        threading.Thread(target=executar, daemon=True).start()
+        return identificador
+
+    def cancelar(self):
+        """
+        Cancela a tarefa atual; o seu resultado será descartado.
+        """
+        with self._trava:
+            if self._cancelada is not None:
+                self._cancelada.set()
+            self._cancelada = None
+            self._inicio = None
+            self._fracao = None
+
+    def concluir(self, valor_evento):
+        """
+        Trata o evento de conclusão de uma tarefa.
+
+        Parâmetros:
+        -----------
+        valor_evento : tuple
+            `values[evento]`, como enviado pela thread da tarefa.
+
+        Retorna:
+        --------
+        tuple ou None
+            (resultado, erro) da tarefa atual, ou None se a tarefa já tiver
+            sido substituída ou cancelada (o evento deve ser ignorado).
+        """
+        identificador, resultado, erro = valor_evento
+        with self._trava:
+            if identificador != self._identificador or self._cancelada is None:
+                return None
+            self._cancelada = None
+            self._inicio = None
+            self._fracao = None
+        return resultado, erro
+
+    @property
+    def ocupado(self):
+        """Indica se há uma tarefa em andamento."""
+        return self._cancelada is not None
+
+    @property
+    def tempo_decorrido(self):
+        """Segundos desde o início da tarefa atual (0 se não houver)."""
+        inicio = self._inicio
+        return 0.0 if inicio is None else time.perf_counter() - inicio
+
+    @property
+    def progresso(self):
+        """Fração concluída da tarefa atual (de 0 a 1), ou None se ela não informar."""
+        return self._fracao
+
+    @property
+    def tempo_restante(self):
+        """Estimativa, em segundos, do tempo até o fim da tarefa atual (None se desconhecido)."""
+        fracao = self._fracao
+        if not fracao:
+            return None
+        return self.tempo_decorrido * (1 - fracao) / fracao
+
+def _parametros(funcao):
+    """
+    Nomes dos parâmetros de uma função (ou functools.partial); vazio se não houver assinatura.
+    """
+    try:
+        return inspect.signature(funcao).parameters
+    except (TypeError, ValueError):
+        return {}
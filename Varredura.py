@@ -0,0 +1,171 @@
+from PIL import Image
+
+import numpy as np
+import math
+
+from Filtros import _aplicar_tabela, _tabela_limiar, _kernel_laplaciano, _convolucao
+from Filtros import _gradientes, _normalizar
+from Histograma import calcular_histograma
+
+#
+    # Varredura de parâmetros com etapas compartilhadas
+#
+
+class Pilha:
+    """
+    Pilha preguiçosa de resultados, um por valor de parâmetro.
+
+    Cada imagem só é calculada quando acessada (por índice ou iteração) e
+    fica guardada para os acessos seguintes. As etapas caras comuns a todos
+    os valores já foram calculadas uma única vez pela função de varredura
+    que criou a pilha.
+
+    Exemplo:
+    --------
+    >>> pilha = varrer_limiares(imagem, range(50, 250, 10))
+    >>> pilha.parametros[3], pilha[3]        # só o quarto limiar é calculado
+    >>> for limiar, resultado in pilha.itens():
+    ...     resultado.save(f"limiar_{limiar}.png")
+    """
+
+    def __init__(self, parametros, gerar):
+        """
+        Parâmetros:
+        -----------
+        parametros : iterável
+            Valores do parâmetro varrido, na ordem da pilha.
+        gerar : função
+            Recebe um valor do parâmetro e retorna a PIL.Image correspondente.
+        """
+        self.parametros = list(parametros)
+        self._gerar = gerar
+        self._resultados = {}
+
+    def __len__(self):
+        return len(self.parametros)
+
+    def __getitem__(self, indice):
+        indice = range(len(self.parametros))[indice]
+        if indice not in self._resultados:
+            self._resultados[indice] = self._gerar(self.parametros[indice])
+        return self._resultados[indice]
+
+    def __iter__(self):
+        for indice in range(len(self.parametros)):
+            yield self[indice]
+
+    def itens(self):
+        """
+        Itera sobre pares (valor do parâmetro, imagem), calculando sob demanda.
+        """
+        return zip(self.parametros, self)
+
+    def array(self):
+        """
+        Calcula todos os resultados e os empilha num array (n, altura, largura).
+        """
+        return np.stack([np.asarray(resultado) for resultado in self])
+
+def varrer_limiares(imagem, limiares):
+    """
+    Limiarização para vários limiares com uma única conversão para cinza.
+
+    A imagem é convertida para escala de cinza e o seu histograma calculado
+    uma vez; cada limiar é só uma tabela de 256 entradas aplicada à imagem
+    em cinza. O histograma dá, sem aplicar nenhum limiar, a proporção de
+    pixels que ficam brancos em cada um (`pilha.proporcao_branco`).
+
+    Parâmetros:
+    -----------
+    imagem : PIL.Image
+        Imagem de entrada.
+    limiares : iterável de int
+        Limiares a testar.
+
+    Retorna:
+    --------
+    Pilha
+        Resultados idênticos a `limiarizacao(imagem, limiar)` para cada limiar.
+    """
+    cinza = imagem.convert("L")
+    histograma = np.asarray(calcular_histograma(np.asarray(cinza)))
+
+    pilha = Pilha(limiares, lambda limiar: _aplicar_tabela(cinza, _tabela_limiar(limiar)))
+    # Pixels >= limiar ficam brancos: soma do histograma do limiar em diante
+    acima = np.append(np.cumsum(histograma[::-1])[::-1], 0) / histograma.sum()
+    pilha.proporcao_branco = [float(acima[min(max(math.ceil(limiar), 0), 256)])
+                              for limiar in pilha.parametros]
+    return pilha
+
+def varrer_alto_reforco(imagem, fatores_k, tipo_kernel_base='laplaciano_4', recortar_bordas=False):
+    """
+    Filtro de alto reforço para vários fatores k com um único Laplaciano.
+
+    O Laplaciano e a imagem em cinza são calculados uma vez; cada fator
+    custa apenas a soma ponderada e o recorte.
+
+    Parâmetros:
+    -----------
+    imagem : PIL.Image
+        Imagem de entrada.
+    fatores_k : iterável de float
+        Fatores de reforço a testar.
+    tipo_kernel_base, recortar_bordas :
+        Como em `passa_alta_alto_reforco`.
+
+    Retorna:
+    --------
+    Pilha
+        Resultados idênticos a `passa_alta_alto_reforco(imagem, fator_k, ...)` para cada fator.
+    """
+    original_array = np.array(imagem.convert("L"), dtype=np.float32)
+    bordas_array = _convolucao(original_array, _kernel_laplaciano(tipo_kernel_base))
+    if recortar_bordas:
+        np.clip(bordas_array, 0, 255, out=bordas_array)
+
+    def reforco(fator_k):
+        return Image.fromarray(np.clip(original_array + (fator_k * bordas_array), 0, 255).astype(np.uint8))
+
+    return Pilha(fatores_k, reforco)
+
+def varrer_sobel(imagem, direcoes=('ambos', 'horizontal', 'vertical'), pos_processamento='clipping',
+                 tipo_kernel='sobel', tamanho_kernel=3):
+    """
+    Filtro de Sobel em várias direções com um único par Gx/Gy.
+
+    Os gradientes Gx e Gy são calculados uma vez (`Filtros.calcular_gradientes`);
+    cada direção é apenas |Gx|, |Gy| ou a magnitude, seguida do pós-processamento.
+
+    Parâmetros:
+    -----------
+    imagem : PIL.Image
+        Imagem de entrada.
+    direcoes : iterável de str, opcional
+        Direções a calcular ('ambos', 'horizontal', 'vertical'). Default = as três.
+    pos_processamento, tipo_kernel, tamanho_kernel :
+        Como em `filtro_sobel`.
+
+    Retorna:
+    --------
+    Pilha
+        Resultados idênticos a `filtro_sobel(imagem, direcao, ...)` para cada direção.
+    """
+    img_array = np.array(imagem.convert("L"), dtype=np.float32)
+
+    # Todas as saídas pedidas saem do mesmo par Gx/Gy
+    direcoes = list(direcoes)
+    nomes = {'horizontal': 'gx', 'vertical': 'gy'}
+    saidas = tuple(sorted({nomes.get(direcao, 'l2') for direcao in direcoes}))
+    gradientes = _gradientes(img_array, saidas, tipo_kernel, tamanho_kernel)
+
+    def gradiente(direcao):
+        # 'ambos' (magnitude) é o padrão
+        saida = gradientes[nomes.get(direcao, 'l2')]
+
+        if pos_processamento == 'normalizacao':
+            saida = _normalizar(saida, np.min(saida), np.max(saida))
+        else: # 'clipping' é o padrão
+            saida = np.clip(saida, 0, 255)
+        return Image.fromarray(saida.astype(np.uint8))
+
+    return Pilha(direcoes, gradiente)